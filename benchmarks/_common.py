@@ -0,0 +1,37 @@
+# Utilidades compartilhadas pelos benchmarks: caminho de src/, QApplication offscreen e
+# medição por mediana de várias repetições (menos sensível a ruído do que a média).
+import os
+import statistics
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+REPERTORIO = os.path.join(SRC, "..", "repertorio")
+
+
+_app = None
+
+
+def qt_app():
+    # Sem tela por padrão, para resultados comparáveis entre máquinas. A referência fica
+    # no módulo: uma QApplication sem referência seria coletada
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+def median_ns(fn, n: int, repeat: int = 5) -> float:
+    # Mediana, entre `repeat` rodadas, do tempo médio por chamada de fn() (n chamadas)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        for _ in range(n):
+            fn()
+        samples.append((time.perf_counter_ns() - t0) / n)
+    return statistics.median(samples)
@@ -0,0 +1,82 @@
+# Vazão de BleConnection._on_midi: pacote BLE-MIDI → envio para uma saída MIDI falsa.
+#
+#   python benchmarks/bench_midi_forward.py [n_pacotes]
+#
+# Mede o caminho direto (envio no callback) e o caminho com --midi-thread (push na fila
+# do MidiForwarder), em ns por mensagem, para pacotes com 1, 3 e 8 mensagens.
+import random
+import sys
+import time
+
+import _common  # noqa: F401  (ajusta sys.path)
+
+from ble_client import BleConnection
+from midi_forwarder import MidiForwarder
+
+
+class _NullSink:
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+    def send(self, msg: list) -> None:
+        self.count += 1
+
+
+def synthetic_packets(n: int, per_packet: int, seed: int = 0) -> list[bytearray]:
+    # Note-on/note-off alternados com timestamps de 13 bits crescentes
+    rnd = random.Random(seed)
+    packets = []
+    ts = 0
+    for i in range(n):
+        ts = (ts + rnd.randint(5, 20)) & 0x1FFF
+        data = bytearray([0x80 | (ts >> 7 & 0x3F)])
+        for j in range(per_packet):
+            status = 0x90 if (i + j) % 2 == 0 else 0x80
+            data += bytes([0x80 | (ts & 0x7F), status, rnd.randint(48, 84), 100 if status == 0x90 else 0])
+        packets.append(data)
+    return packets
+
+
+def _ns_per_message(ble: BleConnection, packets: list[bytearray], per_packet: int) -> float:
+    t0 = time.perf_counter_ns()
+    for data in packets:
+        ble._on_midi(None, data)
+    return (time.perf_counter_ns() - t0) / (len(packets) * per_packet)
+
+
+def run(n: int = 20_000) -> dict:
+    result = {"packets": n}
+    for per_packet in (1, 3, 8):
+        packets = synthetic_packets(n, per_packet)
+
+        ble  = BleConnection()
+        sink = _NullSink()
+        ble.midi = sink
+        result[f"direct_{per_packet}_ns"] = _ns_per_message(ble, packets, per_packet)
+
+        forwarder = MidiForwarder()
+        forwarder.start()
+        sink = _NullSink()
+        ble  = BleConnection()
+        ble.midi_queue = forwarder.open_queue(sink)
+        t0 = time.perf_counter_ns()
+        result[f"queue_push_{per_packet}_ns"] = _ns_per_message(ble, packets, per_packet)
+        # Tempo até a thread entregar tudo à saída
+        expected = n * per_packet
+        while sink.count < expected:
+            time.sleep(0.0005)
+        result[f"queue_drain_{per_packet}_ns"] = (time.perf_counter_ns() - t0) / expected
+        forwarder.close_queue(ble.midi_queue)
+        forwarder.stop()
+    return result
+
+
+if __name__ == "__main__":
+    result = run(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
+    print(f"{result['packets']} pacotes BLE-MIDI")
+    for per_packet in (1, 3, 8):
+        print(f"  {per_packet} msg/pacote: direto {result[f'direct_{per_packet}_ns']:7.1f} ns/msg · "
+              f"fila {result[f'queue_push_{per_packet}_ns']:7.1f} ns/msg · "
+              f"entregue {result[f'queue_drain_{per_packet}_ns']:7.1f} ns/msg")
@@ -0,0 +1,67 @@
+# Custo do SeletorCircular: pintura por quadro (1–8 seções × 30/60 ticks) e setSections.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_selector.py [n_quadros]
+#
+# A pintura é medida em regime (fundo já em cache), com o giroscópio varrendo o arco e o
+# toque ativo, que é o caso mais caro (destaque da seção e seta de inclinação).
+import sys
+
+import _common
+
+app = _common.qt_app()
+
+from notes_selector import SeletorCircular
+
+
+def _paint_ns(sections: int, ticks: int, frames: int) -> float:
+    w = SeletorCircular(sections=sections, ticks=ticks)
+    w.setSections(sections)
+    w.resize(560, 480)
+    w.tilt_enabled = True
+    w.touch = True
+    w.show()
+    app.processEvents()  # a janela precisa estar exposta para repaint() pintar
+    w.repaint()          # aquece o cache do fundo
+
+    gyros = [(i * 7) % 181 - 90 for i in range(frames)]
+    pos = iter(range(1 << 62))
+
+    def frame():
+        w.gyro = gyros[next(pos) % frames]
+        w.tilt = w.gyro // 3
+        w.repaint()
+
+    ns = _common.median_ns(frame, frames)
+    w.close()
+    w.deleteLater()
+    return ns
+
+
+def _set_sections_ns(calls: int) -> float:
+    w = SeletorCircular()
+    w.resize(560, 480)
+    w.show()
+    app.processEvents()
+    w.setSections(6)
+    counts = iter(range(1 << 62))
+    ns = _common.median_ns(lambda: w.setSections(1 + next(counts) % 8), calls)
+    w.close()
+    w.deleteLater()
+    return ns
+
+
+def run(frames: int = 200) -> dict:
+    result = {"frames": frames}
+    for ticks in (30, 60):
+        for sections in range(1, 9):
+            result[f"paint_s{sections}_t{ticks}_ns"] = _paint_ns(sections, ticks, frames)
+    result["set_sections_ns"] = _set_sections_ns(frames)
+    return result
+
+
+if __name__ == "__main__":
+    result = run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
+    for ticks in (30, 60):
+        row = " ".join(f"{result[f'paint_s{s}_t{ticks}_ns'] / 1e3:6.0f}" for s in range(1, 9))
+        print(f"pintura {ticks} ticks, 1–8 seções (µs/quadro): {row}")
+    print(f"setSections: {result['set_sections_ns'] / 1e3:.0f} µs/chamada")
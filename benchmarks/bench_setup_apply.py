@@ -0,0 +1,79 @@
+# Tempo de leitura e aplicação de setups sobre todo o repertorio/.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_setup_apply.py [rodadas]
+#
+# Mede a varredura da SetupLibrary (fria e com cache de mtime), read_setup por arquivo e
+# config.apply_setup em uma DeviceTab real percorrendo as cenas em ordem, como num show.
+import sys
+import time
+
+import _common
+
+_common.qt_app()
+
+from ble_client import BleConnection
+from config import apply_setup
+from device_tab import DeviceTab
+from setup_library import SetupLibrary, read_setup
+
+
+class _NullMidi:
+    # Saída MIDI falsa com a interface que a DeviceTab usa
+    ports = ["null"]
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _NullWriter:
+    def __init__(self):
+        self.puts = 0
+
+    def put(self, uuid, payload, log) -> None:
+        self.puts += 1
+
+
+def run(rounds: int = 5) -> dict:
+    t0 = time.perf_counter_ns()
+    library = SetupLibrary(_common.REPERTORIO)
+    scan_cold = time.perf_counter_ns() - t0
+    scan_warm = _common.median_ns(library.scan, 20)
+    paths = [e.path for e in library.entries]
+    read  = _common.median_ns(lambda: [read_setup(p) for p in paths], 5) / len(paths)
+
+    ble = BleConnection()
+    ble._writer = writer = _NullWriter()
+    tab = DeviceTab(ble, _NullMidi(), library=library)
+    tab.resize(600, 900)
+    tab.show()
+    tab._apply_initial_state({"notes": ["Dó 3"] * 6})
+
+    setups = [e.data for e in library.entries]
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        for data in setups:
+            apply_setup(tab, data)
+        samples.append((time.perf_counter_ns() - t0) / len(setups))
+    samples.sort()
+    puts = writer.puts / rounds / len(setups)
+    tab.close()
+
+    return {
+        "setups":           len(setups),
+        "scan_cold_ns":     scan_cold,
+        "scan_warm_ns":     scan_warm,
+        "read_ns":          read,
+        "apply_ns":         samples[len(samples) // 2],
+        "ble_puts_per_cue": puts,
+    }
+
+
+if __name__ == "__main__":
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    print(f"{r['setups']} setups em repertorio/")
+    print(f"  varredura fria     : {r['scan_cold_ns'] / 1e6:7.2f} ms")
+    print(f"  varredura (cache)  : {r['scan_warm_ns'] / 1e6:7.2f} ms")
+    print(f"  read_setup         : {r['read_ns'] / 1e3:7.1f} µs/arquivo")
+    print(f"  apply_setup        : {r['apply_ns'] / 1e3:7.1f} µs/cena")
+    print(f"  escritas BLE (put) : {r['ble_puts_per_cue']:7.2f} por cena")
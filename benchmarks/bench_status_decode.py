@@ -0,0 +1,63 @@
+# Micro-benchmark da decodificação de pacotes STATUS (8 bytes) em BleConnection._on_status.
+#
+#   python benchmarks/bench_status_decode.py [n_pacotes]
+#
+# Compara o caminho antigo (struct.unpack + pyqtSignal de 4 argumentos) com o atual
+# (struct.Struct pré-compilado + registro reutilizado entregue por chamada direta).
+import random
+import struct
+import sys
+
+import _common
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ble_client import BleConnection, STATUS_STRUCT
+
+
+class _LegacyConnection(QObject):
+    status_received = pyqtSignal(int, bool, int, int)
+
+    def _on_status(self, _, data: bytearray):
+        state, touch, gyro_x, accel_x, tilt = struct.unpack("<BBhhh", data)
+        self.status_received.emit(gyro_x, bool(touch), state, tilt)
+
+
+def synthetic_packets(n: int, seed: int = 0) -> list[bytearray]:
+    rnd = random.Random(seed)
+    return [
+        bytearray(STATUS_STRUCT.pack(0, rnd.random() < 0.3, rnd.randint(-90, 90),
+                                     rnd.randint(-2000, 2000), rnd.randint(-90, 90)))
+        for _ in range(n)
+    ]
+
+
+def _ns_per_packet(handler, packets: list[bytearray]) -> float:
+    # Mediana de várias passadas completas sobre os pacotes, como nos demais benchmarks
+    def feed():
+        for data in packets:
+            handler(None, data)
+    return _common.median_ns(feed, 1) / len(packets)
+
+
+def run(n: int = 100_000) -> dict:
+    packets = synthetic_packets(n)
+
+    legacy = _LegacyConnection()
+    legacy.status_received.connect(lambda gyro, touch, state, tilt: None)
+
+    ble = BleConnection()
+    ble.on_status = lambda sample: None
+
+    return {
+        "packets":       n,
+        "legacy_ns":     _ns_per_packet(legacy._on_status, packets),
+        "on_status_ns":  _ns_per_packet(ble._on_status, packets),
+    }
+
+
+if __name__ == "__main__":
+    result = run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
+    print(f"{result['packets']} pacotes STATUS")
+    print(f"  unpack + pyqtSignal : {result['legacy_ns']:8.1f} ns/pacote")
+    print(f"  Struct + registro   : {result['on_status_ns']:8.1f} ns/pacote")
@@ -0,0 +1,94 @@
+# Executa todos os benchmarks e grava os resultados em JSON para comparar versões.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/run_all.py [--out ARQUIVO] [--compare BASE.json]
+#
+# Sem --out, grava em benchmarks/results/<commit>.json. Com --compare, imprime a variação
+# de cada métrica em relação a um resultado anterior (positivo = mais lento).
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import _common
+
+_common.qt_app()
+
+import bench_midi_forward
+import bench_selector
+import bench_setup_apply
+import bench_status_decode
+
+BENCHMARKS = {
+    "status_decode": bench_status_decode.run,
+    "midi_forward":  bench_midi_forward.run,
+    "selector":      bench_selector.run,
+    "setup_apply":   bench_setup_apply.run,
+}
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_HERE,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def _meta() -> dict:
+    from PyQt6.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+    return {
+        "commit":   _git_commit(),
+        "date":     datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":   platform.python_version(),
+        "qt":       QT_VERSION_STR,
+        "pyqt":     PYQT_VERSION_STR,
+        "platform": platform.platform(),
+        "machine":  platform.machine(),
+        "qpa":      os.environ.get("QT_QPA_PLATFORM", ""),
+    }
+
+
+def compare(base: dict, current: dict) -> None:
+    print(f"Comparação com {base['meta']['commit']} ({base['meta']['date']}):")
+    for bench, metrics in current["results"].items():
+        old = base["results"].get(bench, {})
+        for key, value in metrics.items():
+            if not key.endswith("_ns") or key not in old or not old[key]:
+                continue
+            delta = (value - old[key]) / old[key] * 100
+            print(f"  {bench}.{key:<28} {old[key]:12.1f} → {value:12.1f} ns  {delta:+6.1f}%")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="run_all")
+    parser.add_argument("--out", metavar="ARQUIVO")
+    parser.add_argument("--compare", metavar="BASE")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NOME")
+    args = parser.parse_args(argv)
+
+    data = {"meta": _meta(), "results": {}}
+    for name, run in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"→ {name}", flush=True)
+        data["results"][name] = run()
+
+    out = args.out or os.path.join(_HERE, "results", f"{data['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(data, f, indent=2)
+    print("Resultados salvos em", out)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), data)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
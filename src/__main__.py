@@ -1,12 +1,128 @@
+import os
 import sys
+import time
+
+_T0 = time.perf_counter()
+
 import asyncio
+import argparse
+
+
+class _StartupProfile:
+    # Marcos de tempo da inicialização, exibidos com --profile-startup
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._marks: list[tuple[str, float]] = []
+
+    def mark(self, label: str) -> None:
+        if self.enabled:
+            self._marks.append((label, time.perf_counter()))
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        print("Inicialização →")
+        prev = _T0
+        for label, t in self._marks:
+            print(f"  {label:<36} +{(t - prev) * 1e3:7.1f} ms   {(t - _T0) * 1e3:7.1f} ms")
+            prev = t
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="contato")
+    parser.add_argument("--midi-thread", action="store_true",
+                        help="envia o BLE-MIDI por uma thread dedicada, fora do event loop")
+    parser.add_argument("--midi-delay-ms", type=float, default=0.0, metavar="MS",
+                        help="reagenda o BLE-MIDI pelos timestamps do dispositivo com este "
+                             "atraso fixo, suavizando o agrupamento por intervalo de conexão "
+                             "(implica --midi-thread)")
+    parser.add_argument("--latency", action="store_true",
+                        help="mede latências BLE → MIDI e status → tela e as exibe no rodapé")
+    parser.add_argument("--latency-csv", metavar="ARQUIVO",
+                        help="salva os histogramas de latência em CSV ao sair (implica --latency)")
+    parser.add_argument("--replay", nargs="+", metavar="GRAVAÇÃO",
+                        help="reproduz gravações de --record no lugar dos dispositivos (uma aba cada)")
+    parser.add_argument("--speed", type=float, default=1.0, metavar="X",
+                        help="velocidade da reprodução: 1 = tempo real, 10, 100…, 0 = o mais rápido possível")
+    parser.add_argument("--replay-setup", metavar="ARQUIVO",
+                        help="setup JSON aplicado às abas de reprodução")
+    parser.add_argument("--remap", action="store_true",
+                        help="troca as notas gravadas pelas do setup atual (seção do giroscópio no note-on)")
+    parser.add_argument("--record", metavar="PASTA",
+                        help="grava os pacotes STATUS e BLE-MIDI de cada dispositivo em PASTA")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="exibe o tempo gasto em cada etapa da inicialização")
+    parser.add_argument("--headless", action="store_true",
+                        help="executa só a ponte BLE → MIDI, sem interface gráfica (requer --device)")
+    parser.add_argument("--device", metavar="ENDEREÇO",
+                        help="endereço ou nome do dispositivo (modo --headless)")
+    parser.add_argument("--setup", metavar="ARQUIVO",
+                        help="setup JSON aplicado ao dispositivo ao conectar (modo --headless)")
+    parser.add_argument("--scan-timeout", type=float, default=10.0, metavar="S",
+                        help="tempo máximo procurando o dispositivo (modo --headless)")
+    parser.add_argument("--simulate", type=int, default=0, metavar="N",
+                        help="usa N dispositivos Contato simulados em vez do BLE (testes de carga)")
+    parser.add_argument("--sim-status-hz", type=float, default=50.0, metavar="HZ",
+                        help="taxa de STATUS dos dispositivos simulados (50 a 1000)")
+    parser.add_argument("--sim-midi-hz", type=float, default=4.0, metavar="HZ",
+                        help="pacotes BLE-MIDI de note-on por segundo por dispositivo simulado")
+    parser.add_argument("--sim-midi-burst", type=int, default=1, metavar="N",
+                        help="notas por pacote BLE-MIDI simulado")
+    parser.add_argument("--sim-drop-every", type=float, default=None, metavar="S",
+                        help="derruba o enlace simulado a cada S segundos")
+    parser.add_argument("--sim-drop-at", type=float, nargs="+", default=(), metavar="S",
+                        help="derruba o enlace simulado nestes instantes (s desde a primeira conexão)")
+    # Argumentos desconhecidos ficam para o Qt (-style, -platform, ...)
+    args, _ = parser.parse_known_args(argv)
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    if args.headless and not (args.device or args.simulate or args.replay):
+        parser.error("--headless requer --device")
+    if args.headless and len(args.replay or ()) + args.simulate + bool(args.device) > 1:
+        # A ponte headless conecta uma única fonte
+        parser.error("--headless aceita uma única fonte: --device, uma gravação em --replay "
+                     "ou --simulate 1")
+    return args
+
+
+def _replay_setup(args: argparse.Namespace) -> dict | None:
+    if not args.replay_setup:
+        return None
+    from setup_library import read_setup
+    return read_setup(args.replay_setup)
+
+
+def _simulated(args: argparse.Namespace) -> list:
+    from simulator import simulated_devices
+    return simulated_devices(
+        args.simulate,
+        status_hz=args.sim_status_hz,
+        midi_hz=args.sim_midi_hz,
+        midi_burst=args.sim_midi_burst,
+        disconnect_every_s=args.sim_drop_every,
+        disconnect_script=tuple(args.sim_drop_at),
+    )
+
+
+# Modo headless: despachado antes de carregar widgets, qasync e o splash; a ponte só
+# precisa do QtCore usado pela BleConnection
+if __name__ == "__main__":
+    _ARGS = _parse_args(sys.argv[1:])
+    if _ARGS.headless:
+        from headless import run_headless
+        if _ARGS.replay:
+            _ARGS.setup = _ARGS.setup or _ARGS.replay_setup
+        elif _ARGS.simulate:
+            _ARGS.device = _simulated(_ARGS)[0]
+        sys.exit(asyncio.run(run_headless(_ARGS)))
+
 
 from PyQt6.QtCore import QObject, QEvent, Qt
 from PyQt6.QtWidgets import QPushButton, QCheckBox
 from qasync import QApplication as QAsyncApplication, QEventLoop
 
-from main_window import MainWindow
-from device_picker_dialog import scan_devices, DevicePickerDialog
+# Só o necessário para o splash; bleak, rtmidi, a janela e os diálogos são importados
+# em main_async com o splash já na tela
 from splash_screen import SplashScreen
 
 
@@ -19,7 +135,7 @@ class _EnterKeyFilter(QObject):
         return False
 
 
-async def main_async(app) -> None:
+async def main_async(app, args: argparse.Namespace, profile: _StartupProfile) -> None:
     app.setStyleSheet("""
         QWidget     { background-color: #eaf4fb; color: #1a3a4a; }
         QPushButton { background-color: #f5fbff; border: 1px solid #7dbfe8; padding: 4px 10px; }
@@ -44,22 +160,74 @@ async def main_async(app) -> None:
     splash = SplashScreen()
     splash.show()
     app.processEvents()
-    devices = await scan_devices()
-    splash.close()
+    profile.mark("splash visível")
+
+    from ble_scanner import BleScanner
+    from device_picker_dialog import DevicePickerDialog
+    from main_window import MainWindow
+    from midi_forwarder import MidiForwarder
+    from midi_manager import port_pool
+    profile.mark("módulos carregados")
+
+    port_pool().prefetch()
+
+    # A varredura começa já no splash, que só espera o primeiro dispositivo; o seletor a
+    # desliga ao fechar. Reprodução e simulação não abrem o seletor nem usam o rádio.
+    scanner = BleScanner()
+    if not (args.replay or args.simulate):
+        await scanner.start()
+        profile.mark("varredura iniciada")
+
+    # A janela principal é montada enquanto a varredura procura o primeiro dispositivo
+    forwarder = None
+    if args.midi_thread or args.midi_delay_ms > 0:
+        forwarder = MidiForwarder(delay_ms=args.midi_delay_ms)
+        forwarder.start()
+
+    window = MainWindow(app, scanner, forwarder=forwarder,
+                        latency=args.latency, latency_csv=args.latency_csv,
+                        record_dir=args.record)
+    profile.mark("janela principal criada")
+
+    if args.replay:
+        # Uma aba por gravação; o setup é aplicado por cima do estado inicial de cada uma
+        from config import apply_setup
+        from session_replay import ReplayConnection
+        splash.close()
+        setup = _replay_setup(args)
+        for path in args.replay:
+            ble  = ReplayConnection(path, speed=args.speed, setup=setup, remap=args.remap)
+            page = window.add_device(ble.device, ble=ble)
+            if setup is not None:
+                ble.initial_state.connect(lambda _, page=page: apply_setup(page, setup))
+    elif args.simulate:
+        # Uma aba por dispositivo simulado, sem seletor
+        splash.close()
+        for device in _simulated(args):
+            window.add_device(device)
+    else:
+        await scanner.wait_first(timeout=3.0)
+        splash.close()
+        profile.mark("primeiro dispositivo (ou timeout)")
 
-    dlg = DevicePickerDialog(devices)
-    if not dlg.exec():
-        print("Nenhum dispositivo selecionado — encerrando.")
-        app.quit()
-        return
+        dlg = DevicePickerDialog(scanner)
+        if not dlg.exec():
+            print("Nenhum dispositivo selecionado — encerrando.")
+            if forwarder is not None:
+                forwarder.stop()
+            await scanner.stop()
+            app.quit()
+            return
+        profile.mark("seleção do dispositivo (usuário)")
 
-    window = MainWindow(app)
-    window.add_device(dlg.selected_device)
+        window.add_device(dlg.selected_device)
     window.show()
     await asyncio.sleep(0)
     window.setFixedSize(window.size())
     screen = app.primaryScreen().availableGeometry()
     window.move((screen.width() - window.width()) // 2, screen.top())
+    profile.mark("janela visível")
+    profile.report()
 
     # Anuncia uma descrição do app para leitores de tela (Narrator/NVDA) ao iniciar
     window.setAccessibleName(
@@ -72,9 +240,13 @@ async def main_async(app) -> None:
     await app_close_event.wait()
 
 if __name__ == "__main__":
+    args    = _ARGS
+    profile = _StartupProfile(args.profile_startup)
+    profile.mark("importações iniciais")
     qapp = QAsyncApplication(sys.argv)
     qapp.installEventFilter(_EnterKeyFilter(qapp))
     loop = QEventLoop(qapp)
     asyncio.set_event_loop(loop)
     with loop:
-        loop.run_until_complete(main_async(qapp))
+        profile.mark("QApplication")
+        loop.run_until_complete(main_async(qapp, args, profile))
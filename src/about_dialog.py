@@ -2,21 +2,14 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QApplication,
 )
-from PyQt6.QtGui import QPixmap
-
 from constants import _asset
+from pixmap_cache import scaled_pixmap
 
 
 def _logo(filename: str, w: int = 130, h: int = 56) -> QLabel:
     ratio = QApplication.primaryScreen().devicePixelRatio()
-    pix = QPixmap(_asset("logos", filename)).scaled(
-        int(w * ratio), int(h * ratio),
-        Qt.AspectRatioMode.KeepAspectRatio,
-        Qt.TransformationMode.SmoothTransformation,
-    )
-    pix.setDevicePixelRatio(ratio)
     lbl = QLabel()
-    lbl.setPixmap(pix)
+    lbl.setPixmap(scaled_pixmap(_asset("logos", filename), w, h, ratio))
     lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
     return lbl
 
@@ -69,14 +62,8 @@ class AboutDialog(QDialog):
         layout.addWidget(desc)
         layout.addSpacing(10)
 
-        splash_path = _asset("splash.png")
-        pix = QPixmap(splash_path).scaled(
-            60, 60,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
-        )
         app_logo = QLabel()
-        app_logo.setPixmap(pix)
+        app_logo.setPixmap(scaled_pixmap(_asset("splash.png"), 60, 60))
         app_logo.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(app_logo)
         layout.addSpacing(14)
@@ -1,10 +1,17 @@
 import asyncio
+import contextlib
+import random
 import struct
+import time
 
 from PyQt6.QtCore import QObject, pyqtSignal
 from bleak import BleakClient
+from bleak.exc import BleakError
 from bleak.backends.characteristic import BleakGATTCharacteristic
 
+from ble_midi import BleMidiParser
+from ble_writer import GattWriteQueue
+from session_recorder import KIND_CONNECTED, KIND_DISCONNECTED
 from constants import (
     SECTIONS_CHAR_UUID,
     STATUS_CHARACTERISTIC_UUID,
@@ -15,106 +22,255 @@ from constants import (
     TILT_CHAR_UUID,
     LEGATO_CHAR_UUID,
     AccelLevel,
-    NOTE_NAMES,
+    MIDI_NOTE_NAMES,
     name_to_midi,
 )
 
+# Layout do pacote STATUS: state, touch, gyro_x, accel_x, tilt (8 bytes)
+STATUS_STRUCT = struct.Struct("<BBhhh")
+
+
+class StatusSample:
+    # Registro reutilizado a cada pacote STATUS; consumidores devem copiar o que precisarem
+    __slots__ = ("state", "touch", "gyro", "accel", "tilt", "t_ns")
+
+    def __init__(self):
+        self.t_ns  = 0  # chegada (perf_counter_ns), preenchida só com instrumentação
+        self.state = 0
+        self.touch = False
+        self.gyro  = 0
+        self.accel = 0
+        self.tilt  = 0
+
 
 class BleConnection(QObject):
-    status_received = pyqtSignal(int, bool, int, int)
     initial_state   = pyqtSignal(dict)
     connected       = pyqtSignal()
     disconnected    = pyqtSignal()
 
+    # Espera entre tentativas de reconexão: começa quase imediata e dobra até o teto
+    _RETRY_MIN_S = 0.05
+    _RETRY_MAX_S = 3.0
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._client: BleakClient | None = None
         self.midi = None
-        self._running = True
+        # Fila da thread de envio MIDI (opcional); quando ausente, envia direto no callback
+        self.midi_queue = None
+        self._midi_parser = BleMidiParser()
+        # Compensação de jitter (ble_midi.JitterCompensator); requer midi_queue
+        self.jitter = None
+        # Histogramas de latência (latency.DeviceLatency), apenas com --latency
+        self.latency = None
+        self._writer    = GattWriteQueue()
+        self._running   = True
+        self._link_lost = asyncio.Event()
+        self._stopped   = asyncio.Event()
+
+        # Métricas de reconexão: quantas vezes e quanto tempo até o estado inicial voltar
+        self.reconnects      = 0
+        self.last_recovery_s = 0.0
+        self.max_recovery_s  = 0.0
+
+        # Consumidor das amostras de status, chamado diretamente (sem sinal Qt) a ~50 Hz
+        self.on_status = None
+        self.sample    = StatusSample()
+        # Gravação binária dos pacotes recebidos (session_recorder.SessionRecorder), com --record
+        self.recorder  = None
 
     def _on_status(self, _: BleakGATTCharacteristic, data: bytearray):
-        state, touch, gyro_x, accel_x, tilt = struct.unpack("<BBhhh", data)
-        self.status_received.emit(gyro_x, bool(touch), state, tilt)
+        s = self.sample
+        if self.latency is not None:
+            s.t_ns = time.perf_counter_ns()
+        s.state, touch, s.gyro, s.accel, s.tilt = STATUS_STRUCT.unpack_from(data)
+        s.touch = touch != 0
+        if self.recorder is not None:
+            self.recorder.status(data, s.t_ns)
+        if self.on_status is not None:
+            self.on_status(s)
 
     def _on_midi(self, _: BleakGATTCharacteristic, data: bytearray):
-        raw = bytes(data)
-        if len(raw) < 3:
+        now  = time.perf_counter_ns()
+        if self.recorder is not None:
+            self.recorder.midi(data, now)
+        msgs = self._midi_parser.parse(data)
+        if not msgs:
             return
-        # Chamada direta evita o despacho pelo event loop do Qt
-        self.midi.send(list(raw[-3:]))
+        t_entry = now if self.latency is not None else 0
+        q = self.midi_queue
+        if q is not None:
+            jitter = self.jitter
+            for ts, msg in msgs:
+                q.push(msg, t_entry, jitter.due_ns(ts, now) if jitter is not None else 0)
+        else:
+            # Chamada direta evita o despacho pelo event loop do Qt
+            send = self.midi.send
+            for _, msg in msgs:
+                send(msg)
+            if t_entry:
+                self.latency.ble_to_send.record(time.perf_counter_ns() - t_entry)
+
+    def _on_link_lost(self, _: BleakClient) -> None:
+        self._link_lost.set()
+
+    async def _backoff(self, delay: float) -> None:
+        # Espera com jitter, interrompida imediatamente por stop()
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._stopped.wait(), delay * random.uniform(0.75, 1.25))
 
     async def connect(self, device) -> None:
+        # Um único cliente é reutilizado entre reconexões; no Windows os serviços GATT
+        # vêm do cache do sistema em vez de uma nova descoberta a cada reconexão.
+        # Dispositivos simulados (simulator.SimulatedDevice) trazem a própria classe de cliente.
+        client_cls = getattr(device, "client_factory", BleakClient)
+        client = client_cls(
+            device,
+            disconnected_callback=self._on_link_lost,
+            winrt={"use_cached_services": True},
+        )
+        delay   = self._RETRY_MIN_S
+        lost_at = None
+
         while self._running:
-            async with BleakClient(device) as client:
+            self._link_lost.clear()
+            delivered = False  # initial_state já entregue à interface nesta tentativa
+            try:
+                await client.connect()
                 self._client = client
+                # O relógio BLE-MIDI do dispositivo recomeça a cada conexão
+                self._midi_parser.reset()
+                if self.jitter is not None:
+                    self.jitter.reset()
                 print(f"Conectado a {device.name} / {device.address}")
+                if self.recorder is not None:
+                    self.recorder.event(KIND_CONNECTED)
                 self.connected.emit()
 
                 # Lê estado inicial antes de ativar notificações
-                state: dict = {}
+                state, acked = await self._read_initial_state(client)
+                self._writer.attach(client, acked)
+                if lost_at is not None:
+                    self.reconnects      += 1
+                    self.last_recovery_s = time.monotonic() - lost_at
+                    self.max_recovery_s  = max(self.max_recovery_s, self.last_recovery_s)
+                    lost_at = None
+                    print(f"Reconectado em {self.last_recovery_s:.2f}s "
+                          f"({self.reconnects} reconexões, pior {self.max_recovery_s:.2f}s)")
+                self.initial_state.emit(state)
+                delivered = True
 
-                section_bytes = await client.read_gatt_char(SECTIONS_CHAR_UUID)
-                notes = []
-                for b in section_bytes:
-                    note   = NOTE_NAMES[b % 12]
-                    octave = max(1, min(5, (b // 12) - 1))
-                    notes.append(f"{note} {octave}")
-                state["notes"] = notes
+                # Ambas as notificações são ativadas em paralelo
+                await asyncio.gather(
+                    client.start_notify(BLE_MIDI_CHAR_UUID, self._on_midi),
+                    client.start_notify(STATUS_CHARACTERISTIC_UUID, self._on_status),
+                )
+            except (BleakError, asyncio.TimeoutError, OSError) as e:
+                self._client = None
+                self._writer.detach()
+                if not self._running:
+                    break
+                with contextlib.suppress(BleakError, asyncio.TimeoutError, OSError):
+                    await client.disconnect()
+                if delivered:
+                    # A interface já estava conectada: trata como queda do enlace
+                    lost_at = time.monotonic()
+                    if self.recorder is not None:
+                        self.recorder.event(KIND_DISCONNECTED)
+                    self.disconnected.emit()
+                print(f"Falha na conexão ({e}). Nova tentativa em ~{delay:.2f}s...")
+                await self._backoff(delay)
+                delay = min(delay * 2, self._RETRY_MAX_S)
+                continue
 
-                sens_bytes = await client.read_gatt_char(ACCEL_SENS_CHARACTERISTIC_UUID)
-                raw = int.from_bytes(sens_bytes[:4], "little", signed=True)
-                state["accel_level"] = min(AccelLevel, key=lambda lvl: abs(lvl.value - raw))
+            delay = self._RETRY_MIN_S
+            # Aguarda o callback de desconexão do bleak, sem polling
+            await self._link_lost.wait()
+            self._client = None
+            self._writer.detach()
+            if not self._running:
+                break
+            lost_at = time.monotonic()
+            if self.recorder is not None:
+                self.recorder.event(KIND_DISCONNECTED)
+            self.disconnected.emit()
+            print("Desconectado. Reconectando...")
+            await self._backoff(delay)
 
-                dir_bytes = await client.read_gatt_char(DIR_CHAR_UUID)
-                state["direction"] = 1 if dir_bytes[0] != 0 else 0
+        # stop() pode chegar durante uma conexão em andamento
+        if client.is_connected:
+            with contextlib.suppress(BleakError, asyncio.TimeoutError, OSError):
+                await client.disconnect()
 
-                tilt_bytes = await client.read_gatt_char(TILT_CHAR_UUID)
-                state["tilt_enabled"] = tilt_bytes[0] != 0
+    async def _read_initial_state(self, client: BleakClient) -> tuple[dict, dict[str, bytes]]:
+        # Leituras disparadas juntas: a pilha BLE as encadeia sem esperar uma ida e volta por vez
+        section_bytes, sens_bytes, dir_bytes, tilt_bytes, legato_bytes = await asyncio.gather(
+            client.read_gatt_char(SECTIONS_CHAR_UUID),
+            client.read_gatt_char(ACCEL_SENS_CHARACTERISTIC_UUID),
+            client.read_gatt_char(DIR_CHAR_UUID),
+            client.read_gatt_char(TILT_CHAR_UUID),
+            client.read_gatt_char(LEGATO_CHAR_UUID),
+        )
 
-                legato_bytes = await client.read_gatt_char(LEGATO_CHAR_UUID)
-                state["legato_enabled"] = legato_bytes[0] != 0
+        # Valores lidos viram a referência da fila de escrita (escritas iguais são descartadas)
+        raw = int.from_bytes(sens_bytes[:4], "little", signed=True)
+        acked = {
+            SECTIONS_CHAR_UUID:             bytes(section_bytes),
+            # Mesma codificação de write_accel (int16), seja qual for o tamanho lido
+            ACCEL_SENS_CHARACTERISTIC_UUID: (
+                raw.to_bytes(2, "little", signed=True) if -0x8000 <= raw < 0x8000 else bytes(sens_bytes)
+            ),
+            DIR_CHAR_UUID:                  bytes(dir_bytes[:1]),
+            TILT_CHAR_UUID:                 bytes(tilt_bytes[:1]),
+            LEGATO_CHAR_UUID:               bytes(legato_bytes[:1]),
+        }
 
-                self.initial_state.emit(state)
+        # Escritas que falharam antes de uma queda ainda serão reenviadas: o estado entregue à
+        # interface já as considera, para ela não voltar ao valor antigo do dispositivo
+        values = {**acked, **self._writer.pending_payloads()}
 
-                await client.start_notify(BLE_MIDI_CHAR_UUID, self._on_midi)
-                await client.start_notify(STATUS_CHARACTERISTIC_UUID, self._on_status)
+        state: dict = {}
 
-                while self._running and client.is_connected:
-                    await asyncio.sleep(0.5)
+        state["notes"] = [MIDI_NOTE_NAMES[b & 0x7F] for b in values[SECTIONS_CHAR_UUID]]
 
-            self._client = None
-            if not self._running:
-                break
-            self.disconnected.emit()
-            print("Desconectado. Tentando reconectar em 3s...")
-            await asyncio.sleep(3)
+        accel = int.from_bytes(values[ACCEL_SENS_CHARACTERISTIC_UUID][:4], "little", signed=True)
+        state["accel_level"] = min(AccelLevel, key=lambda lvl: abs(lvl.value - accel))
+
+        state["direction"]      = 1 if values[DIR_CHAR_UUID][0] != 0 else 0
+        state["tilt_enabled"]   = values[TILT_CHAR_UUID][0] != 0
+        state["legato_enabled"] = values[LEGATO_CHAR_UUID][0] != 0
+
+        return state, acked
 
     async def stop(self) -> None:
         self._running = False
+        self._stopped.set()
+        self._link_lost.set()
+        await self._writer.close()
         if self._client is not None and self._client.is_connected:
             await self._client.disconnect()
 
-    async def write_sections(self, notes_list: list) -> None:
+    # Escritas de configuração: enfileiradas e agrupadas pela GattWriteQueue, sem bloquear
+    def write_sections(self, notes_list: list) -> None:
         midi_bytes = bytes([name_to_midi(n) for n in notes_list])
-        await self._client.write_gatt_char(SECTIONS_CHAR_UUID, midi_bytes, response=True)
-        print("Sections →", list(midi_bytes))
+        self._writer.put(SECTIONS_CHAR_UUID, midi_bytes, f"Sections → {list(midi_bytes)}")
 
-    async def write_accel(self, level: AccelLevel) -> None:
+    def write_accel(self, level: AccelLevel) -> None:
         payload = level.value.to_bytes(2, "little", signed=True)
-        await self._client.write_gatt_char(ACCEL_SENS_CHARACTERISTIC_UUID, payload, response=True)
-        print(f"Accel → {level.name} ({level.value})")
+        self._writer.put(ACCEL_SENS_CHARACTERISTIC_UUID, payload,
+                         f"Accel → {level.name} ({level.value})")
 
-    async def write_direction(self, idx: int) -> None:
-        await self._client.write_gatt_char(DIR_CHAR_UUID, bytes([int(idx == 1)]), response=True)
-        print(f"Direção → {'Esquerda' if idx == 1 else 'Direita'}")
+    def write_direction(self, idx: int) -> None:
+        self._writer.put(DIR_CHAR_UUID, bytes([int(idx == 1)]),
+                         f"Direção → {'Esquerda' if idx == 1 else 'Direita'}")
 
-    async def write_tilt_enabled(self, enabled: bool) -> None:
-        await self._client.write_gatt_char(TILT_CHAR_UUID, bytes([int(enabled)]), response=True)
-        print(f"Pitch bend → {'on' if enabled else 'off'}")
+    def write_tilt_enabled(self, enabled: bool) -> None:
+        self._writer.put(TILT_CHAR_UUID, bytes([int(enabled)]),
+                         f"Pitch bend → {'on' if enabled else 'off'}")
 
-    async def write_legato_enabled(self, enabled: bool) -> None:
-        await self._client.write_gatt_char(LEGATO_CHAR_UUID, bytes([int(enabled)]), response=True)
-        print(f"Legato → {'on' if enabled else 'off'}")
+    def write_legato_enabled(self, enabled: bool) -> None:
+        self._writer.put(LEGATO_CHAR_UUID, bytes([int(enabled)]),
+                         f"Legato → {'on' if enabled else 'off'}")
 
     async def calibrate(self) -> None:
         await self._client.write_gatt_char(CALIBRATE_CHAR_UUID, bytes([0x01]), response=True)
@@ -0,0 +1,133 @@
+# Decodificação de pacotes BLE-MIDI (especificação MIDI over Bluetooth LE 1.0):
+#
+#   [cabeçalho] [timestamp] [status] [dados...] ([timestamp] [status|dados...])...
+#
+# O cabeçalho traz os 6 bits altos e cada byte de timestamp os 7 bits baixos de um
+# relógio de 13 bits em milissegundos. Um pacote pode conter várias mensagens, com ou
+# sem running status, e mensagens SysEx podem atravessar vários pacotes.
+
+# Quantidade de bytes de dados por status (canal pelo nibble alto, sistema pelo byte todo)
+_CHANNEL_DATA_LEN = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+_SYSTEM_DATA_LEN  = {0xF1: 1, 0xF2: 2, 0xF3: 1, 0xF6: 0}
+
+_TS_WRAP = 1 << 13
+
+
+class BleMidiParser:
+    __slots__ = ("_running", "_sysex", "_last13", "_clock")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._running = 0
+        self._sysex: list[int] | None = None
+        self._last13  = None
+        self._clock   = 0
+
+    def _unwrap(self, ts13: int) -> int:
+        # Converte o relógio de 13 bits em milissegundos contínuos desde o primeiro pacote
+        if self._last13 is not None:
+            delta = (ts13 - self._last13) % _TS_WRAP
+            # Saltos para trás (reordenação) não fazem o relógio avançar uma volta inteira
+            if delta < _TS_WRAP // 2:
+                self._clock += delta
+        self._last13 = ts13
+        return self._clock
+
+    def parse(self, data: bytes | bytearray) -> list[tuple[int, list[int]]]:
+        # Retorna [(timestamp_ms, mensagem)] na ordem do pacote
+        n = len(data)
+        if n < 2 or data[0] & 0xC0 != 0x80:
+            return []
+
+        out: list[tuple[int, list[int]]] = []
+        high     = data[0] & 0x3F
+        last_low = -1
+        ts       = self._clock
+        i        = 1
+
+        while i < n:
+            b = data[i]
+            if b & 0x80:
+                # Byte de timestamp; se os 7 bits baixos voltarem, o cabeçalho avançou
+                low = b & 0x7F
+                if low < last_low:
+                    high = (high + 1) & 0x3F
+                last_low = low
+                ts = self._unwrap((high << 7) | low)
+                i += 1
+                if i >= n:
+                    break
+                b = data[i]
+                if b & 0x80:
+                    i += 1
+                    if b == 0xF7:
+                        if self._sysex is not None:
+                            self._sysex.append(0xF7)
+                            out.append((ts, self._sysex))
+                            self._sysex = None
+                        continue
+                    if b >= 0xF8:
+                        # Tempo real: não altera o running status
+                        out.append((ts, [b]))
+                        continue
+                    if b == 0xF0:
+                        self._sysex = [0xF0]
+                        continue
+                    status = b
+                    self._running = b if b < 0xF0 else 0
+                else:
+                    status = self._running
+            elif self._sysex is not None:
+                self._sysex.append(b)
+                i += 1
+                continue
+            else:
+                # Running status sem novo timestamp
+                status = self._running
+
+            if not status:
+                i += 1
+                continue
+
+            length = _CHANNEL_DATA_LEN.get(status & 0xF0) if status < 0xF0 else _SYSTEM_DATA_LEN.get(status, 0)
+            end    = i + length
+            if end > n or any(x & 0x80 for x in data[i:end]):
+                # Mensagem truncada ou malformada: descarta o restante do pacote
+                break
+            out.append((ts, [status, *data[i:end]]))
+            i = end
+
+        return out
+
+
+class JitterCompensator:
+    # Reconstrói o tempo relativo das mensagens a partir dos timestamps do dispositivo.
+    # O deslocamento relógio do host − relógio do dispositivo é o mínimo observado (o
+    # caminho mais rápido pelo rádio); mensagens agrupadas num mesmo intervalo de conexão
+    # são liberadas em  t_dispositivo + deslocamento + atraso, espaçadas como foram tocadas.
+    __slots__ = ("delay_ns", "_offset", "_last_due")
+
+    # Relaxa o deslocamento a cada pacote para acompanhar deriva entre os relógios
+    _RELAX_NS = 2_000
+
+    def __init__(self, delay_ms: float):
+        self.delay_ns = int(delay_ms * 1_000_000)
+        self.reset()
+
+    def reset(self) -> None:
+        self._offset   = None
+        self._last_due = 0
+
+    def due_ns(self, device_ms: int, arrival_ns: int) -> int:
+        observed = arrival_ns - device_ms * 1_000_000
+        if self._offset is None or observed < self._offset:
+            self._offset = observed
+        else:
+            self._offset += self._RELAX_NS
+        due = device_ms * 1_000_000 + self._offset + self.delay_ns
+        # Nunca antes da chegada nem fora de ordem
+        due = max(due, arrival_ns, self._last_due)
+        self._last_due = due
+        return due
@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import time
+
+from bleak import BleakScanner
+from bleak.exc import BleakError
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from constants import BLE_MIDI_SERVICE_UUID
+
+
+class ScannedDevice:
+    __slots__ = ("device", "rssi", "last_seen")
+
+    def __init__(self, device, rssi: int):
+        self.device    = device
+        self.rssi      = rssi
+        self.last_seen = time.monotonic()
+
+    @property
+    def address(self) -> str:
+        return self.device.address
+
+
+class BleScanner(QObject):
+    # Varredura BLE em segundo plano com cache de dispositivos por endereço.
+    # O seletor de dispositivos abre instantaneamente com o que já é conhecido e recebe
+    # os novos anúncios enquanto estiver aberto. A varredura só roda enquanto há um seletor
+    # aberto (ou na inicialização): no adaptador único do Pi ela disputa o rádio com os
+    # enlaces dos dispositivos durante o show.
+    device_seen = pyqtSignal(object)  # ScannedDevice visto pela primeira vez
+    device_lost = pyqtSignal(str)     # endereço sem anúncios há mais de EXPIRY_S
+
+    EXPIRY_S = 15.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.devices: dict[str, ScannedDevice] = {}
+        self._scanner = BleakScanner(
+            detection_callback=self._on_detection,
+            service_uuids=[BLE_MIDI_SERVICE_UUID],
+        )
+        self._found   = asyncio.Event()
+        self._running = False
+        # Serializa start/stop: um seletor fechado logo após abrir não deixa a varredura ligada
+        self._lock    = asyncio.Lock()
+
+        self._expiry_timer = QTimer(self)
+        self._expiry_timer.setInterval(2000)
+        self._expiry_timer.timeout.connect(self._expire)
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._running:
+                return
+            try:
+                await self._scanner.start()
+            except (BleakError, OSError) as e:
+                print(f"Falha ao iniciar a varredura BLE: {e}")
+                return
+            self._running = True
+            self._expiry_timer.start()
+
+    async def stop(self) -> None:
+        async with self._lock:
+            self._expiry_timer.stop()
+            if self._running:
+                self._running = False
+                with contextlib.suppress(BleakError, OSError):
+                    await self._scanner.stop()
+
+    async def wait_first(self, timeout: float) -> None:
+        # Retorna assim que houver ao menos um dispositivo no cache (ou no timeout)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._found.wait(), timeout)
+
+    def snapshot(self) -> list[ScannedDevice]:
+        # Expira antes de listar: o timer só roda durante a varredura, e dispositivos já
+        # conectados param de anunciar
+        self._expire()
+        return sorted(self.devices.values(), key=lambda d: d.rssi, reverse=True)
+
+    def _on_detection(self, device, adv) -> None:
+        entry = self.devices.get(device.address)
+        if entry is not None:
+            entry.device    = device
+            entry.rssi      = adv.rssi
+            entry.last_seen = time.monotonic()
+            return
+        entry = ScannedDevice(device, adv.rssi)
+        self.devices[device.address] = entry
+        self._found.set()
+        self.device_seen.emit(entry)
+
+    def _expire(self) -> None:
+        limit = time.monotonic() - self.EXPIRY_S
+        for address in [a for a, d in self.devices.items() if d.last_seen < limit]:
+            del self.devices[address]
+            self.device_lost.emit(address)
+        if not self.devices:
+            self._found.clear()
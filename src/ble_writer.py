@@ -0,0 +1,130 @@
+import asyncio
+import contextlib
+import math
+
+from bleak.exc import BleakError
+
+
+class GattWriteQueue:
+    # Escritas de configuração de uma conexão, executadas em uma task própria para que a
+    # interface nunca aguarde uma ida e volta GATT. Por característica só o último valor
+    # pendente é mantido; rajadas (ex.: carregar um setup) são agrupadas numa janela curta
+    # e valores iguais ao último enfileirado (ou, sem nenhum, ao confirmado) são descartados.
+    # Escritas feitas sem conexão ficam pendentes e saem ao reconectar.
+    # Escritas que falham são repetidas com espera exponencial; esgotadas as tentativas, o
+    # valor continua pendente sem novas tentativas até a reconexão ou um valor novo.
+    WINDOW_S    = 0.03
+    MAX_RETRIES = 5
+
+    def __init__(self):
+        self._client = None
+        # Antes da primeira conexão a interface ainda não mostra o estado do dispositivo
+        self._attached_once = False
+        self._pending: dict[str, tuple[bytes, str]] = {}  # uuid → (payload, log)
+        self._acked:   dict[str, bytes] = {}
+        self._target:  dict[str, bytes] = {}  # último valor enfileirado ou em escrita
+        self._failures: dict[str, int]   = {}  # falhas seguidas por característica
+        self._retry_at: dict[str, float] = {}  # horário (loop) da próxima tentativa
+        self._retry_handle: asyncio.TimerHandle | None = None
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def attach(self, client, acked: dict[str, bytes]) -> None:
+        # Chamado após a leitura do estado inicial, que passa a ser o "último confirmado"
+        self._client = client
+        self._acked  = dict(acked)
+        self._attached_once = True
+        # Reconexão: as escritas que esgotaram as tentativas voltam a ser tentadas
+        self._failures.clear()
+        self._retry_at.clear()
+        # Pendências de antes da queda que o dispositivo ainda não tem são reenviadas
+        self._pending = {u: p for u, p in self._pending.items() if self._acked.get(u) != p[0]}
+        self._target  = {u: p[0] for u, p in self._pending.items()}
+        if self._pending:
+            self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def detach(self) -> None:
+        # Sem conexão não há o que confirmar: o estado volta a ser lido ao reconectar.
+        # As pendências ficam para depois da reconexão.
+        self._client = None
+        self._acked.clear()
+        self._target.clear()
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+
+    def pending_payloads(self) -> dict[str, bytes]:
+        return {u: p[0] for u, p in self._pending.items()}
+
+    def put(self, uuid: str, payload: bytes, log: str) -> None:
+        # Sem conexão o valor fica pendente para a reconexão; attach() descarta o que o
+        # dispositivo já tiver. Desconectado não há confirmado: só o enfileirado conta.
+        if not self._attached_once:
+            return
+        if self._target.get(uuid, self._acked.get(uuid)) == payload:
+            return
+        self._target[uuid]  = payload
+        self._pending[uuid] = (payload, log)
+        self._failures.pop(uuid, None)
+        self._retry_at.pop(uuid, None)
+        self._wake.set()
+
+    async def close(self) -> None:
+        self.detach()
+        self._pending.clear()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _schedule_retry(self) -> None:
+        # Acorda o laço na próxima tentativa vencida entre as pendências em espera
+        if self._retry_handle is not None:
+            self._retry_handle.cancel()
+            self._retry_handle = None
+        waits = [self._retry_at[u] for u in self._pending if self._retry_at.get(u, math.inf) < math.inf]
+        if waits and self._client is not None:
+            self._retry_handle = asyncio.get_event_loop().call_at(min(waits), self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            # Janela de agrupamento: escritas da mesma rajada saem juntas
+            await asyncio.sleep(self.WINDOW_S)
+            self._wake.clear()
+
+            batch, self._pending = self._pending, {}
+            for uuid, (payload, log) in batch.items():
+                client = self._client
+                if client is None:
+                    # Sem conexão: volta a ficar pendente, a não ser que já haja valor mais novo
+                    self._pending.setdefault(uuid, (payload, log))
+                    continue
+                if self._acked.get(uuid) == payload:
+                    continue
+                if self._retry_at.get(uuid, 0.0) > asyncio.get_event_loop().time():
+                    # Ainda em espera após uma falha (ou tentativas esgotadas)
+                    self._pending.setdefault(uuid, (payload, log))
+                    continue
+                try:
+                    await client.write_gatt_char(uuid, payload, response=True)
+                except (BleakError, asyncio.TimeoutError, OSError) as e:
+                    self._pending.setdefault(uuid, (payload, log))
+                    failures = self._failures.get(uuid, 0) + 1
+                    self._failures[uuid] = failures
+                    if failures > self.MAX_RETRIES:
+                        print(f"Falha na escrita ({log}): {e}; nova tentativa ao reconectar")
+                        self._retry_at[uuid] = math.inf
+                    else:
+                        print(f"Falha na escrita ({log}): {e}")
+                        delay = self.WINDOW_S * (2 ** failures)
+                        self._retry_at[uuid] = asyncio.get_event_loop().time() + delay
+                    continue
+                self._failures.pop(uuid, None)
+                self._retry_at.pop(uuid, None)
+                self._acked[uuid] = payload
+                print(log)
+            self._schedule_retry()
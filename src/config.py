@@ -1,15 +1,12 @@
 import json
+import os
 
 from PyQt6.QtWidgets import QFileDialog, QWidget
 
-def save_setup(window: QWidget, parent: QWidget) -> None:
-    path, _ = QFileDialog.getSaveFileName(
-        parent, "Salvar Configuração", "", "JSON Files (*.json)"
-    )
-    if not path:
-        return
+from setup_library import read_setup
 
-    data = {
+def current_setup(window: QWidget) -> dict:
+    return {
         "sections":        window.selector.sections,
         "instrument":      window.selector.current_instrument_index,
         "notes":           [c.currentText() for c in window.selector.combos],
@@ -20,40 +17,94 @@ def save_setup(window: QWidget, parent: QWidget) -> None:
         "direction":       window.dir_combo.currentIndex(),
         "accel_level":     window.accel_combo.currentText(),
     }
+
+
+def diff_setup(current: dict, target: dict) -> dict:
+    # Campos do alvo cujo valor difere do estado atual (chaves ausentes no alvo são mantidas)
+    return {k: v for k, v in target.items() if current.get(k) != v}
+
+
+def save_setup(window: QWidget, parent: QWidget) -> None:
+    path, _ = QFileDialog.getSaveFileName(
+        parent, "Salvar Configuração", window.cues.directory, "JSON Files (*.json)"
+    )
+    if not path:
+        return
+
+    data = current_setup(window)
     with open(path, "w") as f:
         json.dump(data, f, indent=2)
     print("Configuração salva em", path)
 
+    window.library.scan(os.path.dirname(path))
+    window.cues.select(path)
+
 
 def load_setup(window: QWidget, parent: QWidget) -> None:
     path, _ = QFileDialog.getOpenFileName(
-        parent, "Abrir Configuração", "", "JSON Files (*.json)"
+        parent, "Abrir Configuração", window.cues.directory, "JSON Files (*.json)"
     )
     if not path:
         return
 
-    with open(path, "r") as f:
-        data = json.load(f)
-
-    sections = data["sections"]
-    window.notas_spin.blockSignals(True)
-    window.notas_spin.setValue(sections)
-    window.notas_spin.blockSignals(False)
-    window.selector.setSections(sections)
-
-    for combo, note in zip(window.selector.combos, data["notes"]):
-        combo.setCurrentText(note)
-    window.selector.setInstrument(data["instrument"])
-    window.midi_output_combo.setCurrentIndex(data["midi_port_index"])
-    window.channel_combo.setCurrentText(str(data["midi_channel"]))
-
-    if "legato_enabled" in data:
-        window.legato_check.setChecked(data["legato_enabled"])
-    if "tilt_enabled" in data:
-        window.tilt_check.setChecked(data["tilt_enabled"])
-    if "direction" in data:
-        window.dir_combo.setCurrentIndex(data["direction"])
-    if "accel_level" in data:
-        window.accel_combo.setCurrentText(data["accel_level"])
-
-    print("Configuração carregada de", path)
+    try:
+        data = read_setup(path)
+    except (OSError, ValueError) as e:
+        print(f"Configuração inválida ({os.path.basename(path)}): {e}")
+        return
+
+    changes = apply_setup(window, data)
+    window.cues.select(path)
+    print(f"Configuração carregada de {path} ({len(changes)} campos alterados)")
+
+
+def apply_setup(window: QWidget, data: dict) -> dict:
+    # Aplica um setup já validado como um único lote: só os controles que diferem do estado
+    # atual são alterados, as notas geram uma única escrita de seções (sem pré-visualização)
+    # e a aba é repintada uma vez ao final. O program change é sempre reenviado: o synth do
+    # canal pode estar com outro programa mesmo que o índice na aba não mude. Retorna o diff.
+    changes = diff_setup(current_setup(window), data)
+
+    selector = window.selector
+    window.setUpdatesEnabled(False)
+    try:
+        if "sections" in changes or "notes" in changes:
+            old_notes = [c.currentText() for c in selector.combos]
+            selector.blockSignals(True)
+            try:
+                if "sections" in changes:
+                    window.notas_spin.blockSignals(True)
+                    window.notas_spin.setValue(changes["sections"])
+                    window.notas_spin.blockSignals(False)
+                    selector.setSections(changes["sections"])
+                for combo, note in zip(selector.combos, data["notes"]):
+                    if combo.currentText() != note:
+                        combo.setCurrentText(note)
+            finally:
+                selector.blockSignals(False)
+
+            notes = [c.currentText() for c in selector.combos]
+            if notes != old_notes:
+                selector.signalNotes.emit(notes)
+            if "sections" in changes:
+                window.rebuild_tab_order()
+
+        # Porta e canal antes do instrumento: o program change vai para o destino novo
+        port = changes.get("midi_port_index")
+        if port is not None and port < window.midi_output_combo.count():
+            window.midi_output_combo.setCurrentIndex(port)
+        if "midi_channel" in changes:
+            window.channel_combo.setCurrentText(str(changes["midi_channel"]))
+        selector.setInstrument(data["instrument"])
+
+        if "legato_enabled" in changes:
+            window.legato_check.setChecked(changes["legato_enabled"])
+        if "tilt_enabled" in changes:
+            window.tilt_check.setChecked(changes["tilt_enabled"])
+        if "direction" in changes:
+            window.dir_combo.setCurrentIndex(changes["direction"])
+        if "accel_level" in changes:
+            window.accel_combo.setCurrentText(changes["accel_level"])
+    finally:
+        window.setUpdatesEnabled(True)
+    return changes
@@ -7,8 +7,6 @@ def _asset(*parts):
     base = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
     return os.path.join(base, "assets", *parts)
 
-from PyQt6.QtGui import QColor
-
 # UUIDs devem coincidir com platformio/include/config.h
 SECTIONS_CHAR_UUID             = '251beea3-1c81-454f-a9dd-8561ec692ded'
 STATUS_CHARACTERISTIC_UUID     = 'f8d968fe-99d7-46c4-a61c-f38093af6ec8'
@@ -25,7 +23,6 @@ class AccelLevel(Enum):
     MÉDIO = 1250
     FORTE = 1600
 
-PRIMARY_COLOR = QColor(100, 180, 255)
 PORT_INDEX    = 0
 GYRO_MAX_DEG  = 90  # deve coincidir com GYRO_MAX_DEG no firmware
 
@@ -44,9 +41,36 @@ INSTRUMENTS: list[tuple[str, int]] = [
     ("Pad",   89),  ("Pad Halo",      94),
 ]
 
-def name_to_midi(name: str) -> int:
+# Tabelas de notas pré-calculadas para toda a faixa MIDI (0 = "Dó -1" … 127 = "Sol 9").
+# Índice = número MIDI; NOTE_TO_MIDI é o caminho inverso.
+MIDI_NOTE_NAMES: tuple[str, ...] = tuple(
+    f"{NOTE_NAMES[n % 12]} {n // 12 - 1}" for n in range(128)
+)
+# Nomes para leitores de tela: "Dó# 3" → "Dó sustenido 3"
+MIDI_NOTE_ACCESSIBLE: tuple[str, ...] = tuple(
+    name.replace("#", " sustenido") for name in MIDI_NOTE_NAMES
+)
+NOTE_TO_MIDI: dict[str, int] = {name: n for n, name in enumerate(MIDI_NOTE_NAMES)}
+
+def _parse_note_name(name: str) -> int:
+    # Caminho lento para grafias fora da tabela (ex.: "Dó#3"); o resultado é limitado a 0–127
     for note in sorted(NOTE_NAMES, key=len, reverse=True):
         if name.startswith(note):
-            octave = int(name[len(note):].strip())
-            return (octave + 1) * 12 + NOTE_NAMES.index(note)
+            try:
+                octave = int(name[len(note):].strip())
+            except ValueError:
+                return 0
+            return max(0, min(127, (octave + 1) * 12 + NOTE_NAMES.index(note)))
     return 0
+
+def name_to_midi(name: str) -> int:
+    midi = NOTE_TO_MIDI.get(name)
+    return midi if midi is not None else _parse_note_name(name)
+
+
+def __getattr__(name):
+    # QColor criado sob demanda: o modo headless usa estas constantes sem carregar o QtGui
+    if name == "PRIMARY_COLOR":
+        from PyQt6.QtGui import QColor
+        return QColor(100, 180, 255)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
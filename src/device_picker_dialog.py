@@ -1,4 +1,5 @@
-from bleak import BleakScanner
+import asyncio
+
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout,
@@ -6,19 +7,19 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QIcon
 
-from constants import BLE_MIDI_SERVICE_UUID, _asset
+from ble_scanner import BleScanner, ScannedDevice
+from constants import _asset
 
 _ICON = _asset("icon.ico")
 
 
-async def scan_devices():
-    return await BleakScanner.discover(timeout=3.0, service_uuids=[BLE_MIDI_SERVICE_UUID])
-
-
 class DevicePickerDialog(QDialog):
-    def __init__(self, devices):
+    def __init__(self, scanner: BleScanner, exclude: set[str] | None = None):
         super().__init__()
         self.selected_device = None
+        self._scanner = scanner
+        # Endereços que já têm aba aberta não são oferecidos de novo
+        self._exclude = exclude or set()
 
         self.setWindowTitle("Selecionar dispositivo BLE")
         self.setWindowIcon(QIcon(_ICON))
@@ -34,10 +35,13 @@ class DevicePickerDialog(QDialog):
         self.listw = QListWidget(self)
         self.listw.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
         self.listw.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
-        for d in devices:
-            item = QListWidgetItem(f"  {d.name or 'Unknown'}  —  {d.address}")
-            item.setData(Qt.ItemDataRole.UserRole, d)
-            self.listw.addItem(item)
+        # Começa com o cache do scanner e acompanha os anúncios enquanto aberto
+        asyncio.ensure_future(scanner.start())
+        for entry in scanner.snapshot():
+            self._add_device(entry)
+        scanner.device_seen.connect(self._add_device)
+        scanner.device_lost.connect(self._remove_device)
+        self.finished.connect(self._disconnect_scanner)
         layout.addWidget(self.listw)
 
         hl = QHBoxLayout()
@@ -57,6 +61,27 @@ class DevicePickerDialog(QDialog):
             self.listw.setCurrentRow(0)
         self.listw.setFocus()
 
+    def _add_device(self, entry: ScannedDevice) -> None:
+        d    = entry.device
+        if d.address in self._exclude:
+            return
+        item = QListWidgetItem(f"  {d.name or 'Unknown'}  —  {d.address}  ({entry.rssi} dBm)")
+        item.setData(Qt.ItemDataRole.UserRole, d)
+        self.listw.addItem(item)
+        if self.listw.currentRow() < 0:
+            self.listw.setCurrentRow(0)
+
+    def _remove_device(self, address: str) -> None:
+        for row in range(self.listw.count()):
+            if self.listw.item(row).data(Qt.ItemDataRole.UserRole).address == address:
+                self.listw.takeItem(row)
+                return
+
+    def _disconnect_scanner(self) -> None:
+        self._scanner.device_seen.disconnect(self._add_device)
+        self._scanner.device_lost.disconnect(self._remove_device)
+        asyncio.ensure_future(self._scanner.stop())
+
     def _on_ok(self) -> None:
         sel = self.listw.currentItem()
         if sel:
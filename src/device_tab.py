@@ -1,21 +1,25 @@
 import asyncio
 import os
 
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QFrame, QPushButton, QComboBox,
     QLabel, QSpinBox, QCheckBox, QVBoxLayout, QHBoxLayout,
     QGridLayout, QSizePolicy, QStyle,
 )
-from PyQt6.QtGui import QIcon, QPainter, QColor
+from PyQt6.QtGui import QIcon, QPainter, QColor, QKeySequence, QShortcut
 from qasync import asyncSlot
 
-from constants import AccelLevel, GYRO_MAX_DEG, name_to_midi
-from config import save_setup, load_setup
-from ble_client import BleConnection
+from constants import AccelLevel, name_to_midi
+from config import save_setup, load_setup, apply_setup
+from setup_library import CueList, SetupLibrary
+from ble_client import BleConnection, StatusSample
 from midi_manager import MidiManager
+from frame_pacer import FramePacer
+from midi_forwarder import MidiForwarder
+from latency import DeviceLatency
+from ble_midi import JitterCompensator
 from notes_selector import SeletorCircular
-from about_dialog import AboutDialog
 
 
 class LoadingOverlay(QWidget):
@@ -49,11 +53,16 @@ class LoadingOverlay(QWidget):
 
 
 class DeviceTab(QWidget):
-    def __init__(self, ble: BleConnection, midi: MidiManager, device=None):
+    def __init__(self, ble: BleConnection, midi: MidiManager, device=None,
+                 pacer: FramePacer | None = None, forwarder: MidiForwarder | None = None,
+                 latency: bool = False, library: SetupLibrary | None = None):
         super().__init__()
-        self.ble    = ble
-        self.midi   = midi
-        self.device = device
+        self.ble     = ble
+        self.midi    = midi
+        self.device  = device
+        self.pacer   = pacer or FramePacer(self)
+        self.library = library or SetupLibrary()
+        self.cues    = CueList(self.library)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -66,33 +75,33 @@ class DeviceTab(QWidget):
         topbar.setContentsMargins(10, 0, 10, 0)
         topbar.setSpacing(5)
 
-        save_btn     = QPushButton(" Salvar")
-        load_btn     = QPushButton(" Abrir")
-        self.cal_btn = QPushButton(" Calibrar")
-        about_btn    = QPushButton(" Sobre")
+        self.save_btn = QPushButton(" Salvar")
+        self.load_btn = QPushButton(" Abrir")
+        self.cal_btn  = QPushButton(" Calibrar")
+        about_btn     = QPushButton(" Sobre")
 
         style = QApplication.style()
-        save_btn.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton))
-        load_btn.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_DialogOpenButton))
+        self.save_btn.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton))
+        self.load_btn.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_DialogOpenButton))
         self.cal_btn.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_BrowserReload))
         about_btn.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_MessageBoxInformation))
 
-        for b in (save_btn, load_btn, self.cal_btn, about_btn):
+        for b in (self.save_btn, self.load_btn, self.cal_btn, about_btn):
             b.setIconSize(QSize(16, 16))
             b.setFixedHeight(24)
 
-        save_btn.setAccessibleName("Salvar configuração em arquivo")
-        load_btn.setAccessibleName("Abrir configuração de arquivo")
+        self.save_btn.setAccessibleName("Salvar configuração em arquivo")
+        self.load_btn.setAccessibleName("Abrir configuração de arquivo")
         self.cal_btn.setAccessibleName("Calibrar giroscópio")
         about_btn.setAccessibleName("Sobre o Contato GUI")
 
-        save_btn.clicked.connect(lambda: save_setup(self, self))
-        load_btn.clicked.connect(lambda: load_setup(self, self))
+        self.save_btn.clicked.connect(lambda: save_setup(self, self))
+        self.load_btn.clicked.connect(lambda: load_setup(self, self))
         self.cal_btn.clicked.connect(self._on_calibrate)
-        about_btn.clicked.connect(lambda: AboutDialog(self).exec())
+        about_btn.clicked.connect(self._show_about)
 
-        topbar.addWidget(save_btn)
-        topbar.addWidget(load_btn)
+        topbar.addWidget(self.save_btn)
+        topbar.addWidget(self.load_btn)
         topbar.addStretch()
         topbar.addWidget(self.cal_btn)
         topbar.addWidget(about_btn)
@@ -102,6 +111,9 @@ class DeviceTab(QWidget):
         self.selector.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         layout.addWidget(self.selector, stretch=1)
 
+        # Amostras de status são repassadas ao seletor no ritmo da tela, não a cada pacote
+        self.status_slot = self.pacer.attach(self.selector)
+
         self.selector.signalInstrumentChanged.connect(self._on_instrument_changed)
         self.selector.signalNotePreview.connect(self._on_note_preview)
 
@@ -189,6 +201,9 @@ class DeviceTab(QWidget):
         self._status_label = QLabel("—")
         row.addWidget(self._status_label)
         row.addStretch()
+        self._latency_label = QLabel()
+        self._latency_label.setVisible(latency)
+        row.addWidget(self._latency_label)
         layout.addWidget(footer)
 
         # Conectado após a construção dos controles para evitar escrita BLE durante o init
@@ -199,29 +214,59 @@ class DeviceTab(QWidget):
         self.overlay.show_overlay("Conectando...")
 
         self.ble.midi = midi
-        self.ble.status_received.connect(self._on_ble_status)
+        if forwarder is not None:
+            self.ble.midi_queue = forwarder.open_queue(midi)
+            if forwarder.delay_ms > 0:
+                self.ble.jitter = JitterCompensator(forwarder.delay_ms)
+
+        # Instrumentação de latência (--latency): histogramas exibidos no rodapé
+        self.latency = DeviceLatency() if latency else None
+        if self.latency is not None:
+            self.ble.latency = self.latency
+            self.selector.paint_latency = self.latency.status_to_paint
+            if self.ble.midi_queue is not None:
+                self.ble.midi_queue.entry_latency = self.latency.ble_to_send
+                self.latency.queue_to_send = self.ble.midi_queue.latency
+            self._latency_timer = QTimer(self)
+            self._latency_timer.timeout.connect(
+                lambda: self._latency_label.setText(self.latency.summary())
+            )
+            self._latency_timer.start(1000)
+        self.ble.on_status = self._on_ble_status
         self.ble.initial_state.connect(self._apply_initial_state)
         self.ble.disconnected.connect(self._on_ble_disconnected)
+        # Ao reconectar, qualquer nota que tenha escapado do disconnected também é liberada
+        self.ble.connected.connect(self.midi.release_active)
 
         self._last_touch      = False
         self._last_touch_note = ""
         self._calibrating     = False
 
         # Reconstrói a ordem de tabulação sempre que o número de seções muda
-        self.notas_spin.valueChanged.connect(lambda _: self._rebuild_tab_order())
+        self.notas_spin.valueChanged.connect(lambda _: self.rebuild_tab_order())
+
+        # Troca de cena sem diálogo: PageDown/PageUp percorrem os setups do repertório.
+        # Atalhos de janela: só a aba visível responde.
+        QShortcut(QKeySequence(Qt.Key.Key_PageDown), self, lambda: self._step_cue(1))
+        QShortcut(QKeySequence(Qt.Key.Key_PageUp), self, lambda: self._step_cue(-1))
 
         self._set_controls_enabled(False)
-        self._rebuild_tab_order()
+        self.rebuild_tab_order()
 
         if device:
             asyncio.create_task(self.ble.connect(device))
 
+    @property
+    def channel(self) -> int:
+        # Canal MIDI da aba (0–15)
+        return int(self.channel_combo.currentText()) - 1
+
     def _set_status(self, msg: str) -> None:
         self._status_label.setText(msg)
 
-    def _rebuild_tab_order(self) -> None:
+    def rebuild_tab_order(self) -> None:
         # Define a ordem de navegação por Tab: notas primeiro, depois configurações.
-        # Reconstruída ao mudar o número de seções pois os combos são recriados.
+        # Reconstruída ao mudar o número de seções pois os combos visíveis mudam.
         chain = [
             self.selector.center_button,
             *self.selector.combos,
@@ -236,8 +281,9 @@ class DeviceTab(QWidget):
         for a, b in zip(chain, chain[1:]):
             QWidget.setTabOrder(a, b)
 
-    def _on_ble_status(self, gyro: int, touch: bool, state: int, tilt: int) -> None:
-        if state == 1:
+    def _on_ble_status(self, sample: StatusSample) -> None:
+        gyro, touch = sample.gyro, sample.touch
+        if sample.state == 1:
             if not self._calibrating:
                 self._calibrating = True
                 self.overlay.show_overlay("Calibrando...")
@@ -248,20 +294,18 @@ class DeviceTab(QWidget):
             self.overlay.hide_overlay()
 
         if touch and not self._last_touch:
-            notes   = [c.currentText() for c in self.selector.combos]
-            section = min(int((-gyro + GYRO_MAX_DEG) / (2 * GYRO_MAX_DEG) * len(notes)), len(notes) - 1)
-            self._last_touch_note = notes[section]
+            section = self.selector.gyro_map.section_at(gyro)
+            self._last_touch_note = self.selector.combos[section].currentText()
             self._set_status(f"Nota {self._last_touch_note} ativada")
         elif not touch and self._last_touch:
             self._set_status(f"Nota {self._last_touch_note} desativada")
 
-        self._last_touch    = touch
-        self.selector.gyro  = gyro
-        self.selector.touch = touch
-        self.selector.tilt  = tilt
-        self.selector.update()
+        self._last_touch = touch
+        self.pacer.submit(self.status_slot, gyro, touch, sample.tilt, sample.t_ns)
 
     def _on_ble_disconnected(self) -> None:
+        # O note-off de uma nota em andamento pode ter se perdido com o enlace
+        self.midi.release_active()
         self._calibrating = False
         self._set_controls_enabled(False)
         self.overlay.show_overlay("Reconectando...")
@@ -276,6 +320,9 @@ class DeviceTab(QWidget):
         self.midi_output_combo.setEnabled(enabled)
         self.channel_combo.setEnabled(enabled)
         self.cal_btn.setEnabled(enabled)
+        # Setup aberto sem conexão seria sobrescrito pelo estado lido ao reconectar
+        self.save_btn.setEnabled(enabled)
+        self.load_btn.setEnabled(enabled)
 
     def _apply_initial_state(self, state: dict) -> None:
         notes = state.get("notes", [])
@@ -318,42 +365,53 @@ class DeviceTab(QWidget):
             self.legato_check.blockSignals(False)
 
         self._set_controls_enabled(True)
-        self._rebuild_tab_order()
+        self.rebuild_tab_order()
         self.overlay.hide_overlay()
+        if self.ble.reconnects:
+            self._set_status(f"Reconectado em {self.ble.last_recovery_s:.2f}s")
 
     @asyncSlot(int, str)
     async def _on_instrument_changed(self, program: int, name: str) -> None:
-        ch = int(self.channel_combo.currentText()) - 1
-        self.midi.program_change(ch, program)
+        self.midi.program_change(self.channel, program)
 
     def _on_note_preview(self, note_name: str) -> None:
-        ch = int(self.channel_combo.currentText()) - 1
-        self.midi.all_notes_off(ch)
-        self.midi.preview_note(ch, name_to_midi(note_name))
+        self.midi.preview_note(self.channel, name_to_midi(note_name))
         self._set_status(f"Pré-visualização: {note_name}")
 
-    @asyncSlot(list)
-    async def _on_notes_changed(self, notes_list: list) -> None:
-        await self.ble.write_sections(notes_list)
+    def _on_notes_changed(self, notes_list: list) -> None:
+        self.ble.write_sections(notes_list)
 
-    @asyncSlot(int)
-    async def _on_accel_changed(self, idx: int) -> None:
-        level = self.accel_combo.itemData(idx)
-        await self.ble.write_accel(level)
+    def _on_accel_changed(self, idx: int) -> None:
+        self.ble.write_accel(self.accel_combo.itemData(idx))
 
-    @asyncSlot(int)
-    async def _on_tilt_changed(self, state: int) -> None:
+    def _on_tilt_changed(self, state: int) -> None:
         enabled = bool(state)
         self.selector.tilt_enabled = enabled
-        await self.ble.write_tilt_enabled(enabled)
+        self.ble.write_tilt_enabled(enabled)
+
+    def _on_legato_changed(self, state: int) -> None:
+        self.ble.write_legato_enabled(bool(state))
 
-    @asyncSlot(int)
-    async def _on_legato_changed(self, state: int) -> None:
-        await self.ble.write_legato_enabled(bool(state))
+    def _on_direction_changed(self, idx: int) -> None:
+        self.ble.write_direction(idx)
 
-    @asyncSlot(int)
-    async def _on_direction_changed(self, idx: int) -> None:
-        await self.ble.write_direction(idx)
+    def _show_about(self) -> None:
+        # Importado sob demanda: carrega logos que não são necessários ao iniciar
+        from about_dialog import AboutDialog
+        AboutDialog(self).exec()
+
+    def _step_cue(self, delta: int) -> None:
+        if not self.notas_spin.isEnabled():
+            return
+        entry = self.cues.step(delta)
+        if entry is None:
+            if self.cues.path is None:
+                self._set_status("Carregue um setup para navegar pelas cenas")
+            elif self.cues.position < 0:
+                self._set_status(f"Setup {os.path.basename(self.cues.path)} não está mais no repertório")
+            return
+        apply_setup(self, entry.data)
+        self._set_status(f"Cena {self.cues.position + 1}/{len(self.cues.cues())}: {entry.name}")
 
     @asyncSlot()
     async def _on_calibrate(self) -> None:
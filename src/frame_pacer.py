@@ -0,0 +1,88 @@
+from PyQt6.QtCore import QObject, QTimer, Qt
+from PyQt6.QtGui import QGuiApplication
+
+
+class StatusSlot:
+    # Última amostra de status de um dispositivo, aguardando o próximo quadro
+    __slots__ = ("widget", "gyro", "touch", "tilt", "t_ns", "dirty", "received", "dropped", "paints")
+
+    def __init__(self, widget):
+        self.widget   = widget
+        self.gyro     = 0
+        self.touch    = False
+        self.tilt     = 0
+        self.t_ns     = 0
+        self.dirty    = False
+        self.received = 0
+        self.dropped  = 0
+        self.paints   = 0
+
+
+class FramePacer(QObject):
+    # Agrupa as notificações de status (~50 Hz por dispositivo) em no máximo uma
+    # repintura por quadro de tela, e apenas para seletores visíveis.
+
+    def __init__(self, parent=None, interval_ms: int | None = None):
+        super().__init__(parent)
+        if interval_ms is None:
+            screen = QGuiApplication.primaryScreen()
+            rate   = screen.refreshRate() if screen is not None else 60.0
+            interval_ms = max(1, round(1000 / (rate or 60.0)))
+
+        self._slots: list[StatusSlot] = []
+        self._retired = {"received": 0, "dropped": 0, "paints": 0}
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._flush)
+
+    def attach(self, widget) -> StatusSlot:
+        slot = StatusSlot(widget)
+        self._slots.append(slot)
+        return slot
+
+    def detach(self, slot: StatusSlot) -> None:
+        if slot in self._slots:
+            self._slots.remove(slot)
+            self._retired["received"] += slot.received
+            self._retired["dropped"]  += slot.dropped
+            self._retired["paints"]   += slot.paints
+
+    def submit(self, slot: StatusSlot, gyro: int, touch: bool, tilt: int, t_ns: int = 0) -> None:
+        # Chamado a cada pacote: só guarda a amostra; a pintura fica para o próximo quadro
+        if slot.dirty:
+            slot.dropped += 1
+        slot.gyro     = gyro
+        slot.touch    = touch
+        slot.tilt     = tilt
+        slot.t_ns     = t_ns
+        slot.dirty    = True
+        slot.received += 1
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self) -> None:
+        idle = True
+        for slot in self._slots:
+            if not slot.dirty:
+                continue
+            idle = False
+            w = slot.widget
+            w.gyro  = slot.gyro
+            w.touch = slot.touch
+            w.tilt  = slot.tilt
+            w.status_t_ns = slot.t_ns
+            slot.dirty = False
+            # Abas ocultas só recebem a amostra; o Qt as pinta ao voltarem a ser exibidas
+            if w.isVisible():
+                w.update()
+                slot.paints += 1
+
+        if idle:
+            self._timer.stop()
+
+    def stats(self) -> dict:
+        return {
+            key: self._retired[key] + sum(getattr(s, key) for s in self._slots)
+            for key in ("received", "dropped", "paints")
+        }
@@ -0,0 +1,85 @@
+import math
+
+from PyQt6.QtCore import QPointF
+
+from constants import GYRO_MAX_DEG
+
+
+class GyroMap:
+    # Tabelas pré-calculadas indexadas pelo grau do giroscópio (-GYRO_MAX_DEG..GYRO_MAX_DEG).
+    # Compartilhadas pelo seletor (pintura) e pela DeviceTab (nota ativada no toque), de modo
+    # que ambos concordem nas fronteiras entre seções. A direção não entra na chave: o
+    # firmware já aplica a direção antes de reportar o ângulo.
+    __slots__ = (
+        "sections", "ticks", "tick", "section", "section_ticks",
+        "tick_lines", "arrow_points", "divider_lines", "_counts", "_geometry",
+    )
+
+    _SPAN = 2 * GYRO_MAX_DEG
+
+    def __init__(self):
+        self.sections = 0
+        self.ticks    = 0
+        self.tick:          list[int]   = []
+        self.section:       list[int]   = []
+        self.section_ticks: list[range] = []
+        self.tick_lines:    list[tuple[QPointF, QPointF]] = []
+        self.arrow_points:  list[tuple[float, float, float]] = []
+        self.divider_lines: list[tuple[QPointF, QPointF]] = []
+        self._counts   = None
+        self._geometry = None
+
+    def set_counts(self, sections: int, ticks: int) -> bool:
+        # Só as tabelas indexadas pelo ângulo, sem geometria (ex.: reprodução sem seletor).
+        # Retorna se houve mudança.
+        counts = (max(1, sections), max(1, ticks))
+        if counts == self._counts:
+            return False
+        self._counts = counts
+        self.sections, self.ticks = n, t = counts
+        # Aritmética inteira: sem divergências de ponto flutuante nas fronteiras
+        offsets = range(self._SPAN + 1)
+        self.tick    = [o * t // self._SPAN for o in offsets]
+        self.section = [min(o * n // self._SPAN, n - 1) for o in offsets]
+        # Tick i pertence à seção s se s/n <= i/t <= (s+1)/n (ticks de fronteira em ambas)
+        self.section_ticks = [
+            range(-(-s * t // n), (s + 1) * t // n + 1) for s in range(n)
+        ]
+        return True
+
+    def rebuild(self, sections: int, ticks: int, cx: float, cy: float, r: float,
+                tick_long: float, tick_short: float) -> None:
+        geometry = (cx, cy, r, tick_long, tick_short)
+        if not self.set_counts(sections, ticks) and geometry == self._geometry:
+            return
+
+        self._geometry = geometry
+        n, t = self._counts
+
+        self.tick_lines   = []
+        self.arrow_points = []
+        for i in range(t + 1):
+            a      = -math.pi / 2 + math.pi * (i / t)
+            ca, sa = math.cos(a), math.sin(a)
+            tl     = tick_long if i % 5 == 0 else tick_short
+            self.tick_lines.append((QPointF(cx + (r - tl) * ca, cy + (r - tl) * sa),
+                                    QPointF(cx + r * ca, cy + r * sa)))
+            self.arrow_points.append((cx + (r + 12) * ca, cy + (r + 12) * sa, a))
+
+        self.divider_lines = []
+        for i in range(n + 1):
+            a      = -math.pi / 2 + math.pi / n * i
+            ca, sa = math.cos(a), math.sin(a)
+            self.divider_lines.append((QPointF(cx + r * 0.3 * ca, cy + r * 0.3 * sa),
+                                       QPointF(cx + r * 0.8 * ca, cy + r * 0.8 * sa)))
+
+    @staticmethod
+    def index(gyro: int) -> int:
+        # Ângulo positivo aponta para o topo do arco (índice 0)
+        return min(max(GYRO_MAX_DEG - int(gyro), 0), 2 * GYRO_MAX_DEG)
+
+    def tick_at(self, gyro: int) -> int:
+        return self.tick[self.index(gyro)]
+
+    def section_at(self, gyro: int) -> int:
+        return self.section[self.index(gyro)]
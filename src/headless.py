@@ -0,0 +1,148 @@
+import asyncio
+import contextlib
+import signal
+
+from bleak import BleakScanner
+from bleak.exc import BleakError
+
+from ble_client import BleConnection
+from ble_midi import JitterCompensator
+from constants import INSTRUMENTS, PORT_INDEX, AccelLevel
+from latency import DeviceLatency, dump_csv, format_histogram
+from midi_forwarder import MidiForwarder
+from midi_manager import MidiManager, port_pool
+from session_recorder import SessionRecorder, session_path
+from setup_library import read_setup
+from simulator import SimulatedDevice
+
+# Modo sem interface (--headless): a mesma ponte BLE → MIDI da GUI sobre asyncio puro,
+# sem QApplication nem widgets. O setup é aplicado ao dispositivo a cada conexão; como as
+# escritas passam pela GattWriteQueue, só os campos que diferem do estado lido são gravados.
+
+_STATS_INTERVAL_S = 10.0
+
+
+def apply_to_device(ble: BleConnection, data: dict) -> None:
+    ble.write_sections(data["notes"])
+    if "accel_level" in data:
+        level = next((l for l in AccelLevel if l.name.title() == data["accel_level"]), None)
+        if level is not None:
+            ble.write_accel(level)
+    if "direction" in data:
+        ble.write_direction(data["direction"])
+    if "tilt_enabled" in data:
+        ble.write_tilt_enabled(data["tilt_enabled"])
+    if "legato_enabled" in data:
+        ble.write_legato_enabled(data["legato_enabled"])
+
+
+async def find_device(target: str, timeout: float):
+    # Aceita endereço (MAC, ou UUID no macOS) ou nome anunciado
+    key = target.lower()
+    return await BleakScanner.find_device_by_filter(
+        lambda d, _: d.address.lower() == key or (d.name or "").lower() == key,
+        timeout=timeout,
+    )
+
+
+async def run_headless(args) -> int:
+    data = None
+    if args.setup:
+        try:
+            data = read_setup(args.setup)
+        except (OSError, ValueError) as e:
+            print(f"Setup inválido ({args.setup}): {e}")
+            return 2
+
+    replay = None
+    if getattr(args, "replay", None):
+        from session_replay import ReplayConnection
+        replay = ReplayConnection(args.replay[0], speed=args.speed, setup=data,
+                                  remap=args.remap)
+        device = replay.device
+    elif isinstance(args.device, str):
+        print(f"Procurando {args.device}...")
+        try:
+            device = await find_device(args.device, args.scan_timeout)
+        except (BleakError, OSError) as e:
+            print(f"Falha na varredura BLE: {e}")
+            return 1
+        if device is None:
+            print(f"Dispositivo {args.device} não encontrado.")
+            return 1
+    else:
+        # Dispositivo já resolvido (ex.: --simulate)
+        device = args.device
+
+    port = data["midi_port_index"] if data is not None else PORT_INDEX
+    if port >= len(port_pool().ports):
+        print(f"Porta MIDI {port} indisponível, usando {PORT_INDEX}")
+        port = PORT_INDEX
+    midi = MidiManager(port)
+
+    ble = replay or BleConnection()
+    ble.midi = midi
+    if args.record:
+        ble.recorder = SessionRecorder(session_path(args.record, device), device)
+
+    forwarder = None
+    if args.midi_thread or args.midi_delay_ms > 0:
+        forwarder = MidiForwarder(delay_ms=args.midi_delay_ms)
+        forwarder.start()
+        ble.midi_queue = forwarder.open_queue(midi)
+        if forwarder.delay_ms > 0:
+            ble.jitter = JitterCompensator(forwarder.delay_ms)
+
+    latency = DeviceLatency() if args.latency or args.latency_csv else None
+    if latency is not None:
+        ble.latency = latency
+        if ble.midi_queue is not None:
+            ble.midi_queue.entry_latency = latency.ble_to_send
+            latency.queue_to_send = ble.midi_queue.latency
+
+    # Mesma política da GUI: notas presas são liberadas ao perder e ao recuperar o enlace
+    ble.connected.connect(midi.release_active)
+    ble.disconnected.connect(midi.release_active)
+    if data is not None:
+        ble.initial_state.connect(lambda _: apply_to_device(ble, data))
+        midi.program_change(data["midi_channel"] - 1, INSTRUMENTS[data["instrument"]][1])
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError, AttributeError):
+            loop.add_signal_handler(sig, stop.set)
+
+    link    = asyncio.ensure_future(ble.connect(device))
+    stopped = asyncio.ensure_future(stop.wait())
+    try:
+        # Termina por sinal ou quando a conexão encerra sozinha (ex.: fim da reprodução)
+        while not stop.is_set() and not link.done():
+            await asyncio.wait({stopped, link}, timeout=_STATS_INTERVAL_S,
+                               return_when=asyncio.FIRST_COMPLETED)
+            if latency is not None:
+                print(latency.summary())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        stopped.cancel()
+        await ble.stop()
+        try:
+            await link
+        except (BleakError, OSError) as e:
+            print(f"Conexão encerrada com erro: {e}")
+        if forwarder is not None:
+            forwarder.close_queue(ble.midi_queue)
+            print(f"MIDI (thread) → {format_histogram(ble.midi_queue.latency)}")
+            forwarder.stop()
+        midi.panic(data["midi_channel"] - 1 if data is not None else None)
+        midi.close()
+        if ble.recorder is not None:
+            ble.recorder.close()
+        if args.latency_csv:
+            dump_csv(args.latency_csv, [(device.name or device.address, latency)])
+        print(f"Encerrado → {ble.reconnects} reconexões, "
+              f"{midi.tracker.note_ons} note-ons, {midi.tracker.released} notas liberadas")
+        if isinstance(device, SimulatedDevice):
+            print(device.summary())
+    return 0
@@ -0,0 +1,92 @@
+import csv
+import math
+
+# Histograma no estilo HDR: faixa exata até 2*_SUB, depois 32 sub-faixas lineares por
+# potência de dois (erro relativo ≤ ~3%). Valores em nanossegundos, até ~18 minutos.
+_SUB_BITS  = 5
+_SUB       = 1 << _SUB_BITS
+_MAX_SHIFT = 40
+_BUCKETS   = (_MAX_SHIFT + 2) * _SUB
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count  = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        if ns > self.max_ns:
+            self.max_ns = ns
+        if ns < 2 * _SUB:
+            idx = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - _SUB_BITS - 1
+            if shift > _MAX_SHIFT:
+                shift, ns = _MAX_SHIFT, (2 * _SUB << _MAX_SHIFT) - 1
+            idx = shift * _SUB + (ns >> shift)
+        self.counts[idx] += 1
+        self.count += 1
+
+    @staticmethod
+    def _bucket_value(idx: int) -> int:
+        # Maior valor representado pela faixa
+        if idx < 2 * _SUB:
+            return idx
+        shift = idx // _SUB - 1
+        return ((idx - shift * _SUB + 1) << shift) - 1
+
+    def percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self._bucket_value(idx), self.max_ns)
+        return self.max_ns
+
+    def reset(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count  = 0
+        self.max_ns = 0
+
+
+class DeviceLatency:
+    # Histogramas de um dispositivo, ativados com --latency:
+    #   ble_to_send      entrada do callback BLE-MIDI → retorno do envio rtmidi
+    #   queue_to_send    enfileiramento → envio (somente com --midi-thread)
+    #   status_to_paint  entrada do callback STATUS → pintura seguinte do seletor
+    METRICS = ("ble_to_send", "queue_to_send", "status_to_paint")
+
+    def __init__(self):
+        self.ble_to_send     = LatencyHistogram()
+        self.queue_to_send   = LatencyHistogram()
+        self.status_to_paint = LatencyHistogram()
+
+    def summary(self) -> str:
+        return (f"MIDI {format_histogram(self.ble_to_send)}   "
+                f"Tela {format_histogram(self.status_to_paint)}")
+
+
+def format_histogram(h: LatencyHistogram) -> str:
+    return (f"p50 {h.percentile(50) / 1e6:.2f} · p99 {h.percentile(99) / 1e6:.2f}"
+            f" · máx {h.max_ns / 1e6:.2f} ms")
+
+
+def dump_csv(path: str, devices: list[tuple[str, DeviceLatency]]) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["device", "metric", "count", "p50_us", "p90_us", "p99_us", "max_us"])
+        for name, lat in devices:
+            for metric in DeviceLatency.METRICS:
+                h = getattr(lat, metric)
+                writer.writerow([
+                    name, metric, h.count,
+                    *(f"{h.percentile(p) / 1000:.1f}" for p in (50, 90, 99)),
+                    f"{h.max_ns / 1000:.1f}",
+                ])
+    print("Latências salvas em", path)
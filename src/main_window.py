@@ -7,18 +7,39 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QIcon
 
 from ble_client import BleConnection
-from device_picker_dialog import scan_devices, DevicePickerDialog
+from ble_scanner import BleScanner
+from device_picker_dialog import DevicePickerDialog
 from midi_manager import MidiManager
 from constants import PORT_INDEX, _asset
 from device_tab import DeviceTab
+from frame_pacer import FramePacer
+from midi_forwarder import MidiForwarder
+from latency import DeviceLatency, dump_csv, format_histogram
+from session_recorder import SessionRecorder, session_path
+from setup_library import SetupLibrary
+from simulator import SimulatedDevice
 
 _ICON = _asset("icon.ico")
 
 class MainWindow(QWidget):
-    def __init__(self, app):
+    def __init__(self, app, scanner: BleScanner, forwarder: MidiForwarder | None = None,
+                 latency: bool = False, latency_csv: str | None = None,
+                 record_dir: str | None = None):
         super().__init__()
-        self.app      = app
-        self._picking = False
+        self.app         = app
+        self.scanner     = scanner
+        self.forwarder   = forwarder
+        self.latency     = latency or latency_csv is not None
+        self.latency_csv = latency_csv
+        self.record_dir  = record_dir
+        self._picking    = False
+        # Latências das abas já fechadas, exportadas junto com as abertas ao sair
+        self._closed_latency: list[tuple[str, DeviceLatency]] = []
+
+        # Um único marcapasso de quadros para todas as abas
+        self.pacer = FramePacer(self)
+        # Repertório varrido uma vez e compartilhado; cada aba guarda só a sua cena
+        self.library = SetupLibrary()
 
         self.setWindowTitle("Contato GUI")
         self.setWindowIcon(QIcon(_ICON))
@@ -39,11 +60,15 @@ class MainWindow(QWidget):
     def _plus_idx(self) -> int:
         return self.tabs.count() - 1
 
-    def add_device(self, device) -> None:
-        # Instancia uma nova conexão em uma aba nova
-        ble  = BleConnection()
+    def add_device(self, device, ble: BleConnection | None = None) -> DeviceTab:
+        # Instancia uma nova conexão em uma aba nova (ou usa a fornecida, ex.: reprodução)
+        ble  = ble or BleConnection()
         midi = MidiManager(PORT_INDEX)
-        page = DeviceTab(ble=ble, midi=midi, device=device)
+        if self.record_dir:
+            ble.recorder = SessionRecorder(session_path(self.record_dir, device), device)
+        page = DeviceTab(ble=ble, midi=midi, device=device,
+                         pacer=self.pacer, forwarder=self.forwarder, latency=self.latency,
+                         library=self.library)
         idx  = self._plus_idx  # inserir antes do "+"
         label = device.name or device.address
         self.tabs.insertTab(idx, page, label)
@@ -59,6 +84,7 @@ class MainWindow(QWidget):
         )
         close_btn.clicked.connect(lambda: self._close_tab(self.tabs.indexOf(page)))
         self.tabs.tabBar().setTabButton(idx, QTabBar.ButtonPosition.RightSide, close_btn)
+        return page
 
     def _on_tab_bar_clicked(self, index: int) -> None:
         # Quando botão de nova aba é pressionado
@@ -74,8 +100,8 @@ class MainWindow(QWidget):
     async def _open_picker(self) -> None:
         self._picking = True
         try:
-            devices = await scan_devices()
-            dlg = DevicePickerDialog(devices)
+            open_addresses = {self.tabs.widget(i).device.address for i in range(self._plus_idx)}
+            dlg = DevicePickerDialog(self.scanner, open_addresses)
             future = asyncio.get_event_loop().create_future()
             dlg.finished.connect(future.set_result)
             dlg.open()
@@ -85,10 +111,19 @@ class MainWindow(QWidget):
             self._picking = False
 
     def _cleanup_page(self, page: DeviceTab) -> None:
+        if self.latency_csv:
+            self._closed_latency.append((self.tabs.tabText(self.tabs.indexOf(page)), page.latency))
         asyncio.create_task(page.ble.stop())
-        for ch in range(16):
-            page.midi.all_notes_off(ch)
+        self.pacer.detach(page.status_slot)
+        if page.ble.midi_queue is not None:
+            self.forwarder.close_queue(page.ble.midi_queue)
+            print(f"MIDI (thread) → {format_histogram(page.ble.midi_queue.latency)}")
+        page.midi.panic(page.channel)
         page.midi.close()
+        if page.ble.recorder is not None:
+            page.ble.recorder.close()
+        if isinstance(page.device, SimulatedDevice):
+            print(page.device.summary())
         page.deleteLater()
 
     def _close_tab(self, index: int) -> None:
@@ -101,6 +136,14 @@ class MainWindow(QWidget):
         while self.tabs.count() > 1:
             self._cleanup_page(self.tabs.widget(0))
             self.tabs.removeTab(0)
+        if self.latency_csv:
+            dump_csv(self.latency_csv, self._closed_latency)
+        stats = self.pacer.stats()
+        print(f"Quadros → {stats['paints']} pinturas, "
+              f"{stats['dropped']} de {stats['received']} amostras descartadas")
+        if self.forwarder is not None:
+            self.forwarder.stop()
+        asyncio.ensure_future(self.scanner.stop())
         self.app.quit()
         super().closeEvent(event)
 
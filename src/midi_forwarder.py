@@ -0,0 +1,123 @@
+import collections
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+
+from latency import LatencyHistogram
+
+
+def _raise_thread_priority() -> None:
+    # Melhor esforço: sem privilégios o sistema simplesmente recusa
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 15)  # TIME_CRITICAL
+        elif hasattr(os, "sched_setscheduler"):
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+    except (OSError, AttributeError):
+        pass
+
+
+class ForwardQueue:
+    # Fila de produtor único (callback BLE) consumida pela thread de envio.
+    # deque.append/popleft são atômicos, então nenhum lock é tomado por mensagem.
+    __slots__ = ("sink", "latency", "entry_latency", "_items", "_wake")
+
+    def __init__(self, sink, wake: threading.Event):
+        self.sink    = sink
+        # Latência fila → envio, sempre registrada
+        self.latency = LatencyHistogram()
+        # Latência entrada do callback → envio, apenas com instrumentação ativa
+        self.entry_latency: LatencyHistogram | None = None
+        self._items  = collections.deque()
+        self._wake   = wake
+
+    def push(self, msg: list, t_entry: int = 0, due_ns: int = 0) -> None:
+        # due_ns > 0 agenda o envio para esse instante (perf_counter_ns)
+        self._items.append((time.perf_counter_ns(), msg, t_entry, due_ns))
+        self._wake.set()
+
+
+class MidiForwarder:
+    # Thread dedicada de alta prioridade que envia as mensagens BLE-MIDI de todas as abas,
+    # isolando o tempo das notas das pinturas e diálogos do event loop Qt/asyncio.
+    # Com delay_ms > 0, as mensagens são liberadas nos instantes reconstruídos a partir
+    # dos timestamps BLE-MIDI (ver ble_midi.JitterCompensator).
+
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay_ms = delay_ms
+        self._queues: list[ForwardQueue] = []
+        self._pending: list[tuple] = []  # heap de (due_ns, seq, fila, msg, t, t_entry)
+        self._seq     = itertools.count()
+        self._wake    = threading.Event()
+        # Protege filas e heap contra close_queue: depois que ela retorna, nada mais
+        # daquela fila chega à saída MIDI
+        self._lock    = threading.Lock()
+        self._running = False
+        self._thread  = threading.Thread(target=self._run, name="midi-forward", daemon=True)
+
+    def start(self) -> None:
+        self._running = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    def open_queue(self, sink) -> ForwardQueue:
+        q = ForwardQueue(sink, self._wake)
+        # Substitui a lista em vez de mutá-la: a thread itera sobre uma cópia estável
+        self._queues = [*self._queues, q]
+        return q
+
+    def close_queue(self, q: ForwardQueue) -> None:
+        with self._lock:
+            self._queues = [x for x in self._queues if x is not q]
+            # Descarta também os envios já adiados pela compensação de jitter
+            pending = [e for e in self._pending if e[2] is not q]
+            if len(pending) != len(self._pending):
+                heapq.heapify(pending)
+                self._pending[:] = pending
+            q._items.clear()
+
+    def _run(self) -> None:
+        _raise_thread_priority()
+        clock   = time.perf_counter_ns
+        pending = self._pending
+        lock    = self._lock
+        while self._running:
+            timeout = None
+            with lock:
+                if pending:
+                    timeout = max(0.0, (pending[0][0] - clock()) / 1e9)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+            with lock:
+                now = clock()
+                for q in self._queues:
+                    items = q._items
+                    while items:
+                        t, msg, t_entry, due = items.popleft()
+                        if due > now:
+                            heapq.heappush(pending, (due, next(self._seq), q, msg, t, t_entry))
+                        else:
+                            self._send(q, msg, t, t_entry)
+
+                while pending and pending[0][0] <= clock():
+                    _, _, q, msg, t, t_entry = heapq.heappop(pending)
+                    self._send(q, msg, t, t_entry)
+
+    @staticmethod
+    def _send(q: ForwardQueue, msg: list, t: int, t_entry: int) -> None:
+        q.sink.send(msg)
+        now = time.perf_counter_ns()
+        q.latency.record(now - t)
+        if t_entry:
+            q.entry_latency.record(now - t_entry)
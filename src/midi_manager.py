@@ -1,25 +1,263 @@
+import heapq
+import itertools
 import threading
+import time
 import rtmidi
 
+from note_tracker import ActiveNoteTracker
 
-class MidiManager:
-    def __init__(self, port_index: int = 0):
-        self._out   = rtmidi.MidiOut()
-        self._ports: list[str] = self._out.get_ports()
-        self._out.open_port(port_index)
-        print(f"MIDI → [{port_index}] {self._ports[port_index]}")
+
+class MidiScheduler:
+    # Uma thread por saída com um heap de envios agendados (note-off de pré-visualização
+    # e qualquer outro evento MIDI temporizado). Substitui um threading.Timer por nota.
+    def __init__(self, send):
+        self._send    = send
+        self._heap:    list[list] = []  # [due_ns, seq, msg, ativo]
+        self._entries: dict[int, list] = {}
+        self._seq     = itertools.count()
+        self._cond    = threading.Condition()
+        self._running = True
+        self._thread  = threading.Thread(target=self._run, name="midi-scheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay_s: float, msg: list) -> int:
+        return self.schedule_at(time.perf_counter_ns() + int(delay_s * 1e9), msg)
+
+    def schedule_at(self, due_ns: int, msg: list) -> int:
+        token = next(self._seq)
+        entry = [due_ns, token, msg, True]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            self._entries[token] = entry
+            # Só acorda a thread se o novo evento passou a ser o próximo
+            if self._heap[0] is entry:
+                self._cond.notify()
+        return token
+
+    def cancel(self, token: int) -> list | None:
+        # Retorna a mensagem cancelada se ela ainda estava pendente
+        with self._cond:
+            entry = self._entries.pop(token, None)
+            if entry is None:
+                return None
+            entry[3] = False
+            return entry[2]
+
+    def fire(self, token: int) -> None:
+        # Antecipa um evento pendente: envia agora, pela mesma saída
+        msg = self.cancel(token)
+        if msg is not None:
+            self._send(msg)
+
+    def flush(self) -> None:
+        # Envia imediatamente tudo o que está pendente, na ordem agendada
+        with self._cond:
+            pending = [e[2] for e in sorted(self._heap) if e[3]]
+            self._heap.clear()
+            self._entries.clear()
+        for msg in pending:
+            self._send(msg)
+
+    def clear(self) -> None:
+        with self._cond:
+            self._heap.clear()
+            self._entries.clear()
+
+    def close(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        heap = self._heap
+        while True:
+            with self._cond:
+                while self._running:
+                    if heap and not heap[0][3]:
+                        heapq.heappop(heap)
+                        continue
+                    timeout = (heap[0][0] - time.perf_counter_ns()) / 1e9 if heap else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                entry = heapq.heappop(heap)
+                self._entries.pop(entry[1], None)
+            self._send(entry[2])
+
+
+class _PooledPort:
+    __slots__ = ("index", "name", "out", "refs", "lock", "_scheduler")
+
+    def __init__(self, index: int, name: str, out):
+        self.index = index
+        self.name  = name
+        self.out   = out
+        self.refs  = 0
+        # A saída é usada pela thread principal, pelo agendador e pelo encaminhador MIDI
+        self.lock  = threading.Lock()
+        self._scheduler: MidiScheduler | None = None
+
+    def send(self, msg: list) -> None:
+        with self.lock:
+            self.out.send_message(msg)
+
+    def send_many(self, msgs: list[list]) -> None:
+        # Uma mensagem por chamada: o rtmidi recusa mensagens não-SysEx com mais de 3 bytes
+        # em todos os backends, inclusive ALSA
+        with self.lock:
+            send = self.out.send_message
+            for m in msgs:
+                send(m)
+
+    @property
+    def scheduler(self) -> MidiScheduler:
+        # Criado sob demanda: portas sem eventos temporizados não ganham thread
+        if self._scheduler is None:
+            self._scheduler = MidiScheduler(self.send)
+        return self._scheduler
+
+    def close(self) -> None:
+        if self._scheduler is not None:
+            # Note-offs pendentes saem antes de fechar, para não deixar notas presas
+            self._scheduler.flush()
+            self._scheduler.close()
+        with self.lock:
+            self.out.close_port()
+
+
+class MidiPortPool:
+    # Uma única saída rtmidi por porta, compartilhada pelas abas com contagem de referências.
+    # As portas são enumeradas uma vez; cada aba mantém apenas o seu canal.
+    def __init__(self):
+        self._ports: list[str] | None = None
+        self._open:  dict[int, _PooledPort] = {}
+        self._lock  = threading.Lock()
 
     @property
     def ports(self) -> list[str]:
+        if self._ports is None:
+            # Se prefetch() estiver enumerando, espera por ele em vez de repetir
+            with self._lock:
+                if self._ports is None:
+                    self._enumerate()
         return list(self._ports)
 
+    def refresh(self) -> list[str]:
+        with self._lock:
+            self._enumerate()
+        return list(self._ports)
+
+    def prefetch(self) -> None:
+        # Enumera as portas em segundo plano durante a inicialização (alguns backends
+        # levam centenas de ms); quem consultar `ports` antes do fim aguarda o resultado
+        threading.Thread(target=self.refresh, name="midi-ports", daemon=True).start()
+
+    def _enumerate(self) -> None:
+        probe = rtmidi.MidiOut()
+        self._ports = probe.get_ports()
+        del probe
+
+    def acquire(self, idx: int) -> _PooledPort:
+        port = self._open.get(idx)
+        if port is None:
+            names = self.ports
+            out   = rtmidi.MidiOut()
+            out.open_port(idx)
+            port  = _PooledPort(idx, names[idx], out)
+            self._open[idx] = port
+            print(f"MIDI → [{idx}] {port.name}")
+        port.refs += 1
+        return port
+
+    def release(self, port: _PooledPort) -> None:
+        port.refs -= 1
+        if port.refs <= 0 and self._open.get(port.index) is port:
+            del self._open[port.index]
+            port.close()
+
+
+_pool: MidiPortPool | None = None
+
+
+def port_pool() -> MidiPortPool:
+    global _pool
+    if _pool is None:
+        _pool = MidiPortPool()
+    return _pool
+
+
+class MidiManager:
+    def __init__(self, port_index: int = 0, pool: MidiPortPool | None = None):
+        self._pool = pool or port_pool()
+        self._port: _PooledPort | None = self._pool.acquire(port_index)
+        self._preview_off: tuple[MidiScheduler, int] | None = None
+        # Notas soando enviadas por esta aba (BLE-MIDI e mensagens da interface)
+        self.tracker = ActiveNoteTracker()
+        # Rastreador e troca de porta: send() pode vir da thread do encaminhador MIDI
+        self._lock   = threading.RLock()
+
+    @property
+    def ports(self) -> list[str]:
+        return self._pool.ports
+
     def open_port(self, idx: int) -> None:
-        self._out.close_port()
-        self._out.open_port(idx)
-        print(f"MIDI → [{idx}] {self._ports[idx]}")
+        with self._lock:
+            if self._port is None or idx == self._port.index:
+                return
+            # Notas soando ficariam presas na porta antiga: libera-as lá antes da troca
+            # (release_active também zera o rastreador)
+            self.release_active()
+            # Adquire a nova antes de soltar a antiga: outras abas na porta antiga não a veem fechar
+            old        = self._port
+            self._port = self._pool.acquire(idx)
+            self._pool.release(old)
 
     def send(self, msg: list) -> None:
-        self._out.send_message(msg)
+        with self._lock:
+            if self._port is None:
+                return
+            self.tracker.feed(msg)
+            self._port.send(msg)
+
+    def send_many(self, msgs: list[list]) -> None:
+        # Várias mensagens sob um único lock da saída
+        with self._lock:
+            if self._port is None:
+                return
+            feed = self.tracker.feed
+            for m in msgs:
+                feed(m)
+            self._port.send_many(msgs)
+
+    def panic(self, channel: int | None = None) -> None:
+        # Note-off explícito só para as notas que sabemos soando, mais CC123/CC120 apenas no
+        # canal da aba e nos canais que ela usou: a porta é compartilhada com outras abas
+        with self._lock:
+            if self._port is None:
+                return
+            channels = self.tracker.channels
+            if channel is not None:
+                channels |= 1 << (channel & 0x0F)
+            msgs = self.tracker.release_messages()
+            for ch in range(16):
+                if channels >> ch & 1:
+                    msgs.append([0xB0 | ch, 123, 0])
+                    msgs.append([0xB0 | ch, 120, 0])
+            self._port.send_many(msgs)
+
+    def release_active(self) -> None:
+        # Libera apenas as notas que ficaram soando (ex.: queda do BLE entre note-on e note-off)
+        with self._lock:
+            if self._port is None:
+                return
+            msgs = self.tracker.release_messages()
+            if msgs:
+                self._port.send_many(msgs)
+        if msgs:
+            print(f"Notas presas liberadas → {len(msgs)}")
 
     def program_change(self, channel: int, program: int) -> None:
         status = 0xC0 | (channel & 0x0F)
@@ -29,13 +267,32 @@ class MidiManager:
     def all_notes_off(self, channel: int) -> None:
         self.send([0xB0 | (channel & 0x0F), 123, 0])
 
+    @property
+    def scheduler(self) -> MidiScheduler:
+        return self._port.scheduler
+
     def preview_note(self, channel: int, note: int, duration_ms: int = 350) -> None:
-        self.send([0x90 | (channel & 0x0F), note & 0x7F, 80])
-        threading.Timer(
-            duration_ms / 1000.0,
-            self.send,
-            args=([0x80 | (channel & 0x0F), note & 0x7F, 0],),
-        ).start()
+        # Uma nova pré-visualização antecipa o note-off pendente da anterior
+        if self._preview_off is not None:
+            sched, token = self._preview_off
+            sched.fire(token)
+
+        # Silencia o canal e toca a nota sob um único lock da saída. A nota de
+        # pré-visualização não entra no rastreamento: o agendador garante o seu note-off.
+        ch = channel & 0x0F
+        with self._lock:
+            if self._port is None:
+                return
+            self.tracker.clear(ch)
+            self._port.send_many([[0xB0 | ch, 123, 0], [0x90 | ch, note & 0x7F, 80]])
+            sched = self.scheduler
+        token = sched.schedule(duration_ms / 1000.0, [0x80 | (channel & 0x0F), note & 0x7F, 0])
+        self._preview_off = (sched, token)
 
     def close(self) -> None:
-        self._out.close_port()
+        # Idempotente: fechar a aba depois de um panic/encerramento não solta a porta duas vezes
+        with self._lock:
+            if self._port is None:
+                return
+            self._pool.release(self._port)
+            self._port = None
@@ -0,0 +1,50 @@
+import time
+
+
+class ActiveNoteTracker:
+    # Notas soando por canal, uma máscara de 128 bits (bit n = nota n), alimentada por toda
+    # mensagem enviada. No caminho quente custa apenas operações de bit; relógio só é lido
+    # quando um canal sai do silêncio ou quando notas são liberadas.
+    __slots__ = ("masks", "channels", "since_ns", "note_ons", "released", "last_release_ns")
+
+    def __init__(self):
+        self.masks    = [0] * 16
+        self.channels = 0         # bit c = canal c já recebeu alguma mensagem
+        self.since_ns = [0] * 16  # instante em que cada canal começou a soar
+        self.note_ons = 0
+        self.released = 0
+        self.last_release_ns = 0
+
+    def feed(self, msg: list) -> None:
+        kind = msg[0] & 0xF0
+        if kind < 0xF0:
+            self.channels |= 1 << (msg[0] & 0x0F)
+        if kind == 0x90 and msg[2]:
+            ch = msg[0] & 0x0F
+            if not self.masks[ch]:
+                self.since_ns[ch] = time.perf_counter_ns()
+            self.masks[ch] |= 1 << msg[1]
+            self.note_ons += 1
+        elif kind == 0x80 or kind == 0x90:
+            self.masks[msg[0] & 0x0F] &= ~(1 << msg[1])
+        elif kind == 0xB0 and msg[1] in (120, 123):
+            self.masks[msg[0] & 0x0F] = 0
+
+    def sounding(self, channel: int) -> list[int]:
+        bits = self.masks[channel & 0x0F]
+        return [n for n in range(128) if bits >> n & 1]
+
+    def count(self) -> int:
+        return sum(m.bit_count() for m in self.masks)
+
+    def clear(self, channel: int) -> None:
+        self.masks[channel & 0x0F] = 0
+
+    def release_messages(self) -> list[list]:
+        # Note-offs para tudo o que está soando; o rastreador volta ao silêncio
+        msgs = [[0x80 | ch, n, 0] for ch in range(16) for n in self.sounding(ch)]
+        if msgs:
+            self.released += len(msgs)
+            self.last_release_ns = time.perf_counter_ns()
+        self.masks = [0] * 16
+        return msgs
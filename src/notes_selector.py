@@ -1,14 +1,15 @@
 import math
+import time
 
-from PyQt6.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt6.QtCore import Qt, QRectF, pyqtSignal
 from PyQt6.QtWidgets import QFrame, QPushButton
 from PyQt6.QtGui import (
-    QPainter, QPen, QColor, QPainterPath,
+    QPainter, QPen, QColor, QPainterPath, QPixmap, QStandardItem, QStandardItemModel,
 )
 
-from constants import NOTE_NAMES, INSTRUMENTS
+from constants import INSTRUMENTS, MIDI_NOTE_NAMES, MIDI_NOTE_ACCESSIBLE
 from combo_box import ToggleEnterComboBox
-from instrument_dialog import InstrumentSelectorDialog
+from gyro_map import GyroMap
 
 
 # Cores usadas na renderização do seletor
@@ -16,6 +17,22 @@ _C_TRACK   = QColor(71,  85,  105, 80)
 _C_TICK    = QColor(100, 120, 140)
 _C_ACCENT  = QColor(50,  150, 210)
 _C_DIVIDER = QColor(50,  150, 210, 45)
+_C_MAJOR   = QColor(148, 163, 184)
+_C_LABEL   = QColor(100, 116, 139, 180)
+
+# Canetas criadas uma vez e reutilizadas em todas as pinturas
+_PEN_TRACK       = QPen(_C_TRACK, 1.5)
+_PEN_TRACK_INNER = QPen(_C_TRACK, 1)
+_PEN_TICK        = QPen(_C_TICK, 1)
+_PEN_MAJOR       = QPen(_C_MAJOR, 1.5)
+_PEN_DIVIDER     = QPen(_C_DIVIDER, 1.5)
+_PEN_HIGHLIGHT   = QPen(_C_ACCENT, 2.5)
+_PEN_DIVIDER_HI  = QPen(_C_ACCENT, 2)
+_PEN_ARROW       = QPen(_C_ACCENT, 2)
+
+
+# Nota das seções novas ("Dó 3")
+_DEFAULT_NOTE = 48
 
 
 def _nota_acessivel(secao: int, total: int) -> str:
@@ -41,6 +58,8 @@ class SeletorCircular(QFrame):
         self.tick_long  = 14
         self.tick_short = 7
         self.combos: list[ToggleEnterComboBox] = []
+        # Todos os combos já criados; os excedentes ficam ocultos para reuso
+        self._combo_pool: list[ToggleEnterComboBox] = []
 
         # Estado recebido via BLE (~50 Hz)
         self.gyro         = 0
@@ -48,12 +67,17 @@ class SeletorCircular(QFrame):
         self.tilt         = 0
         self.tilt_enabled = False
 
-        # Lista completa de notas disponíveis para os combos (Dó 1 … Si 5)
-        self._all_notes = [
-            f"{note} {octave}"
-            for octave in range(1, 6)
-            for note in NOTE_NAMES
-        ]
+        # Instrumentação opcional: chegada do status exibido → pintura (latency.LatencyHistogram)
+        self.status_t_ns   = 0
+        self.paint_latency = None
+
+        # Um único modelo compartilhado por todos os combos de nota: toda a faixa MIDI,
+        # com o nome falado de cada nota para leitores de tela
+        self._notes_model = QStandardItemModel(self)
+        for name, spoken in zip(MIDI_NOTE_NAMES, MIDI_NOTE_ACCESSIBLE):
+            item = QStandardItem(name)
+            item.setData(spoken, Qt.ItemDataRole.AccessibleTextRole)
+            self._notes_model.appendRow(item)
 
         self.instruments = INSTRUMENTS
         self.current_instrument_index = 0
@@ -73,43 +97,45 @@ class SeletorCircular(QFrame):
         self._arrow_path.lineTo(-1,  4); self._arrow_path.lineTo(4,  0); self._arrow_path.lineTo(-1, -4)
         self._arrow_path.closeSubpath()
 
+        # Camada estática (arcos, ticks, divisórias, rótulo) renderizada uma vez em pixmap;
+        # refeita apenas quando a chave (tamanho, DPR, seções, ticks) muda
+        self._background: QPixmap | None = None
+        self._background_key: tuple | None = None
+
+        # Mapeamento grau → tick/seção e coordenadas, refeito ao mudar seções ou tamanho
+        self.gyro_map = GyroMap()
+        self._rebuild_map()
+
     def setSections(self, count: int) -> None:
-        # Recria os combos preservando as notas existentes; preenche com "Dó 3" se houver novas seções
+        # Reaproveita os combos existentes: mostra/oculta só a diferença e preenche as novas
+        # seções com "Dó 3". signalNotes só é emitido se a lista de notas mudou.
         count     = int(count)
         old_notes = [c.currentText() for c in self.combos]
 
         self.sections = count
-        new_notes = (
-            old_notes[:count] if count <= len(old_notes)
-            else old_notes + [f"{NOTE_NAMES[0]} 3"] * (count - len(old_notes))
-        )
-
-        for c in self.combos:
-            c.deleteLater()
-        self.combos = []
+        while len(self._combo_pool) < count:
+            self._combo_pool.append(self._create_combo())
 
-        for i, note in enumerate(new_notes):
-            combo = ToggleEnterComboBox(self)
-            combo.addItems(self._all_notes)
-            combo.blockSignals(True)
-            combo.setCurrentText(note)
-            combo.blockSignals(False)
+        for i, combo in enumerate(self._combo_pool):
+            if i >= count:
+                combo.hide()
+                continue
+            if i >= len(old_notes):
+                combo.blockSignals(True)
+                combo.setCurrentIndex(_DEFAULT_NOTE)
+                combo.blockSignals(False)
             combo.setAccessibleName(_nota_acessivel(count - i, count))
-            combo.currentIndexChanged.connect(
-                lambda _: self.signalNotes.emit([c.currentText() for c in self.combos])
-            )
-            combo.currentIndexChanged.connect(
-                lambda _, c=combo: self.signalNotePreview.emit(c.currentText())
-            )
             combo.show()
-            self.combos.append(combo)
+        self.combos = self._combo_pool[:count]
+
+        notes = [c.currentText() for c in self.combos]
+        if notes != old_notes:
+            self.signalNotes.emit(notes)
 
-        self.signalNotes.emit([c.currentText() for c in self.combos])
+        self._rebuild_map()
 
         # Reposiciona os combos e o botão central conforme o novo tamanho do widget
-        w, h   = self.width(), self.height()
-        cx, cy = w / 2 - self.offset, h / 2
-        r      = min((h / 2) - self.margin, (w - cx) - self.margin)
+        cx, cy, r     = self._geometry()
         section_angle = math.pi / max(1, self.sections)
 
         bw, bh = self.center_button.width(), self.center_button.height()
@@ -124,6 +150,17 @@ class SeletorCircular(QFrame):
 
         self.update()
 
+    def _create_combo(self) -> ToggleEnterComboBox:
+        combo = ToggleEnterComboBox(self)
+        combo.setModel(self._notes_model)
+        combo.currentIndexChanged.connect(
+            lambda _: self.signalNotes.emit([c.currentText() for c in self.combos])
+        )
+        combo.currentIndexChanged.connect(
+            lambda _, c=combo: self.signalNotePreview.emit(c.currentText())
+        )
+        return combo
+
     def setInstrument(self, index: int) -> None:
         # Atualiza o instrumento selecionado e emite o número de programa GM correspondente
         self.current_instrument_index = index
@@ -132,103 +169,116 @@ class SeletorCircular(QFrame):
         self.signalInstrumentChanged.emit(program, name)
 
     def _show_instrument_selector(self) -> None:
+        # Importado sob demanda: o diálogo não é necessário para abrir a janela
+        from instrument_dialog import InstrumentSelectorDialog
         dlg = InstrumentSelectorDialog(
             self.instruments, self.current_instrument_index, self
         )
         dlg.instrumentSelected.connect(self.setInstrument)
         dlg.exec()
 
+    def _geometry(self) -> tuple[float, float, float]:
+        w, h   = self.width(), self.height()
+        cx, cy = w / 2 - self.offset, h / 2
+        r      = min((h / 2) - self.margin, (w - cx) - self.margin)
+        return cx, cy, r
+
     def _draw_arrow(self, painter, px, py, angle, opacity=1.0) -> None:
         # Desenha a seta indicadora em (px, py) rotacionada para o ângulo dado (radianos)
         painter.save()
         painter.setOpacity(opacity)
         painter.translate(px, py)
         painter.rotate(math.degrees(angle))
-        painter.setPen(QPen(_C_ACCENT, 2))
+        painter.setPen(_PEN_ARROW)
         painter.setBrush(_C_ACCENT)
         painter.drawPath(self._arrow_path)
         painter.restore()
 
-    def paintEvent(self, _):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    def _rebuild_map(self) -> None:
+        self.gyro_map.rebuild(self.sections, self.ticks, *self._geometry(),
+                              self.tick_long, self.tick_short)
 
-        w, h   = self.width(), self.height()
-        cx, cy = w / 2 - self.offset, h / 2
-        r      = min((h / 2) - self.margin, (w - cx) - self.margin)
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._rebuild_map()
 
-        section_angle    = math.pi / max(1, self.sections)
-        selected_tick    = int(((self.gyro * math.pi / -180) + math.pi / 2) / (math.pi / self.ticks))
-        selected_section = int(((self.gyro * math.pi / -180) + math.pi / 2) / (math.pi / self.sections))
-        start_ang, end_ang = -math.pi / 2, math.pi / 2
+    def _render_background(self) -> QPixmap:
+        dpr = self.devicePixelRatioF()
+        pix = QPixmap(max(1, round(self.width() * dpr)), max(1, round(self.height() * dpr)))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.GlobalColor.transparent)
 
-        # Arco externo e interno do seletor
-        arc_rect = QRectF(cx - r, cy - r, 2 * r, 2 * r)
-        painter.setPen(QPen(_C_TRACK, 1.5))
-        painter.drawArc(arc_rect, 90 * 16, -180 * 16)
-
-        inner_r    = r * 0.3
-        inner_rect = QRectF(cx - inner_r, cy - inner_r, 2 * inner_r, 2 * inner_r)
-        painter.setPen(QPen(_C_TRACK, 1))
-        painter.drawArc(inner_rect, 90 * 16, -180 * 16)
-
-        # Marcações (ticks) ao longo do arco; a seta substitui o tick da posição atual
-        for i in range(self.ticks + 1):
-            t      = start_ang + (end_ang - start_ang) * (i / self.ticks)
-            ox, oy = cx + r * math.cos(t), cy + r * math.sin(t)
-            tl     = self.tick_long if i % 5 == 0 else self.tick_short
-            ix, iy = cx + (r - tl) * math.cos(t), cy + (r - tl) * math.sin(t)
-
-            if i == selected_tick:
-                # Desenha a seta indicadora na borda externa do arco
-                self._draw_arrow(painter, cx + (r + 12) * math.cos(t),
-                                           cy + (r + 12) * math.sin(t), t)
-                continue
+        painter = QPainter(pix)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        cx, cy, r = self._geometry()
+        gmap      = self.gyro_map
 
-            in_section = (
-                0 <= selected_section < self.sections
-                and selected_section * section_angle
-                    <= t + math.pi / 2
-                    <= (selected_section + 1) * section_angle
-            )
-            highlight = in_section and self.touch
+        # Arco externo e interno do seletor
+        painter.setPen(_PEN_TRACK)
+        painter.drawArc(QRectF(cx - r, cy - r, 2 * r, 2 * r), 90 * 16, -180 * 16)
 
-            if highlight:
-                pen = QPen(_C_ACCENT, 2.5)
-            elif i % 5 == 0:
-                pen = QPen(QColor(148, 163, 184), 1.5)
-            else:
-                pen = QPen(_C_TICK, 1)
+        inner_r = r * 0.3
+        painter.setPen(_PEN_TRACK_INNER)
+        painter.drawArc(QRectF(cx - inner_r, cy - inner_r, 2 * inner_r, 2 * inner_r), 90 * 16, -180 * 16)
 
-            painter.setPen(pen)
-            painter.drawLine(QPointF(ix, iy), QPointF(ox, oy))
+        # Marcações (ticks) ao longo do arco
+        for i, (inner, outer) in enumerate(gmap.tick_lines):
+            painter.setPen(_PEN_MAJOR if i % 5 == 0 else _PEN_TICK)
+            painter.drawLine(inner, outer)
 
         # Rótulo de 0° na extremidade direita do arco
-        painter.setPen(QColor(100, 116, 139, 180))
+        painter.setPen(_C_LABEL)
         f = painter.font()
         f.setPointSize(8)
         painter.setFont(f)
         painter.drawText(int(cx + r + 30), int(cy + 4), "0°")
 
         # Divisórias entre seções
-        for i in range(self.sections + 1):
-            t      = start_ang + section_angle * i
-            x1, y1 = cx + r * 0.3 * math.cos(t), cy + r * 0.3 * math.sin(t)
-            x2, y2 = cx + r * 0.8 * math.cos(t), cy + r * 0.8 * math.sin(t)
+        painter.setPen(_PEN_DIVIDER)
+        for inner, outer in gmap.divider_lines:
+            painter.drawLine(inner, outer)
 
-            if i in (selected_section, selected_section + 1) and self.touch:
-                pen = QPen(_C_ACCENT, 2)
-            else:
-                pen = QPen(_C_DIVIDER, 1.5)
+        painter.end()
+        return pix
 
-            painter.setPen(pen)
-            painter.drawLine(QPointF(x1, y1), QPointF(x2, y2))
+    def paintEvent(self, _):
+        key = (self.width(), self.height(), self.devicePixelRatioF(), self.sections, self.ticks)
+        if key != self._background_key:
+            self._background     = self._render_background()
+            self._background_key = key
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        gmap    = self.gyro_map
+        idx     = gmap.index(self.gyro)
+        section = gmap.section[idx]
+
+        # Sobreposições dinâmicas: seção destacada durante o toque
+        if self.touch:
+            painter.setPen(_PEN_HIGHLIGHT)
+            for i in gmap.section_ticks[section]:
+                painter.drawLine(*gmap.tick_lines[i])
+
+            painter.setPen(_PEN_DIVIDER_HI)
+            painter.drawLine(*gmap.divider_lines[section])
+            painter.drawLine(*gmap.divider_lines[section + 1])
+
+        # Seta indicadora na borda externa do arco
+        px, py, t = gmap.arrow_points[gmap.tick[idx]]
+        self._draw_arrow(painter, px, py, t)
 
         # Seta fantasma do pitch bend (inclinação do antebraço), com opacidade reduzida
         if self.tilt_enabled:
+            cx, cy, r   = self._geometry()
             gyro_angle  = self.gyro * math.pi / -180
             tilt_offset = -(self.tilt / 90.0) * (30 * math.pi / 180)
             ghost_angle = max(-math.pi / 2, min(math.pi / 2, gyro_angle + tilt_offset))
             self._draw_arrow(painter, cx + (r + 12) * math.cos(ghost_angle),
                                       cy + (r + 12) * math.sin(ghost_angle),
                                       ghost_angle, opacity=0.3)
+
+        if self.paint_latency is not None and self.status_t_ns:
+            self.paint_latency.record(time.perf_counter_ns() - self.status_t_ns)
+            self.status_t_ns = 0
@@ -0,0 +1,52 @@
+import hashlib
+import os
+
+from PyQt6.QtCore import Qt, QStandardPaths
+from PyQt6.QtGui import QPixmap, QPixmapCache
+
+_cache_dir: str | None = None
+
+
+def _disk_dir() -> str | None:
+    global _cache_dir
+    if _cache_dir is None:
+        base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+        path = os.path.join(base or ".", "contato-gui", "pixmaps")
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            path = ""
+        _cache_dir = path
+    return _cache_dir or None
+
+
+def scaled_pixmap(path: str, w: int, h: int, ratio: float = 1.0) -> QPixmap:
+    # Logo redimensionado (suave) para w×h lógicos. Decodificar e escalar os PNGs originais
+    # custa dezenas de ms; o resultado fica em memória (QPixmapCache) e em disco, com o
+    # mtime do original na chave para que um asset novo invalide a cópia.
+    pw, ph = int(w * ratio), int(h * ratio)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    key    = f"{digest}-{pw}x{ph}-{mtime:x}"
+
+    pix = QPixmapCache.find(key)
+    if pix is None:
+        folder = _disk_dir()
+        disk   = os.path.join(folder, key + ".png") if folder else None
+        pix    = QPixmap(disk) if disk and os.path.exists(disk) else QPixmap()
+        if pix.isNull():
+            pix = QPixmap(path).scaled(
+                pw, ph,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+            if disk and not pix.isNull():
+                pix.save(disk, "PNG")
+        QPixmapCache.insert(key, pix)
+
+    pix = QPixmap(pix)
+    pix.setDevicePixelRatio(ratio)
+    return pix
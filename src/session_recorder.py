@@ -0,0 +1,149 @@
+import collections
+import datetime
+import os
+import re
+import struct
+import threading
+import time
+
+# Gravação de sessão (--record DIR): cada pacote STATUS e BLE-MIDI recebido vira um
+# registro binário de tamanho fixo, um arquivo por dispositivo por sessão. O callback BLE só
+# faz pack_into num buffer pré-alocado; blocos cheios vão para uma thread de escrita por
+# uma fila limitada. Se o disco não acompanhar, registros são descartados (e contados) em
+# vez de atrasar as notificações.
+
+MAGIC   = b"CTTOREC1"
+VERSION = 1
+
+# magic, versão, tamanho do registro, início (epoch s), nome do dispositivo, endereço
+HEADER = struct.Struct("<8sHHd48s32s")
+# t_ns desde o início (monotônico), tipo, bytes úteis, payload
+RECORD = struct.Struct("<QBB22s")
+
+KIND_STATUS       = 1
+KIND_MIDI         = 2  # primeiro pedaço de um pacote BLE-MIDI; len = bytes neste registro
+KIND_MIDI_CONT    = 3  # continuação do pacote anterior (pacotes maiores que 22 bytes)
+KIND_CONNECTED    = 4
+KIND_DISCONNECTED = 5
+
+_PAYLOAD     = 22
+_CHUNK       = 2048       # registros por bloco (64 KiB)
+_MAX_PENDING = 32         # blocos aguardando escrita (2 MiB)
+_HANDOFF_NS  = 500_000_000  # bloco parcial é entregue após 0,5 s (limita a perda num crash)
+
+
+def session_path(directory: str, device) -> str:
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    addr  = re.sub(r"[^0-9A-Za-z]+", "", device.address)
+    return os.path.join(directory, f"{stamp}_{addr}.ctrec")
+
+
+class SessionRecorder:
+    def __init__(self, path: str, device=None):
+        self.path      = path
+        self.records   = 0
+        self.dropped   = 0
+        self._t0       = time.perf_counter_ns()
+        self._buf      = bytearray(RECORD.size * _CHUNK)
+        self._off      = 0
+        self._chunk_t  = self._t0
+        self._pending: collections.deque[bytes] = collections.deque()
+        self._wake     = threading.Event()
+        self._closed   = False
+
+        name = (getattr(device, "name", None) or "").encode()[:48]
+        addr = (getattr(device, "address", None) or "").encode()[:32]
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time(), name, addr))
+        self._file.flush()
+
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    # Chamados no callback BLE (event loop)
+    def status(self, data: bytes, t_ns: int = 0) -> None:
+        self._put(KIND_STATUS, data, t_ns or time.perf_counter_ns())
+
+    def midi(self, data: bytes, t_ns: int = 0) -> None:
+        t = t_ns or time.perf_counter_ns()
+        self._put(KIND_MIDI, data[:_PAYLOAD], t)
+        for i in range(_PAYLOAD, len(data), _PAYLOAD):
+            self._put(KIND_MIDI_CONT, data[i:i + _PAYLOAD], t)
+
+    def event(self, kind: int) -> None:
+        self._put(kind, b"", time.perf_counter_ns())
+        self._handoff()
+
+    def _put(self, kind: int, payload: bytes, t: int) -> None:
+        if self._closed:
+            return
+        RECORD.pack_into(self._buf, self._off, t - self._t0, kind, len(payload), payload)
+        self._off += RECORD.size
+        self.records += 1
+        if self._off == len(self._buf) or t - self._chunk_t > _HANDOFF_NS:
+            self._handoff()
+
+    def _handoff(self) -> None:
+        if not self._off:
+            return
+        if len(self._pending) < _MAX_PENDING:
+            self._pending.append(bytes(memoryview(self._buf)[:self._off]))
+            self._wake.set()
+        else:
+            self.dropped += self._off // RECORD.size
+        self._off     = 0
+        self._chunk_t = time.perf_counter_ns()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self._pending:
+                chunk = self._pending.popleft()
+                try:
+                    self._file.write(chunk)
+                except OSError as e:
+                    print(f"Falha na gravação da sessão ({self.path}): {e}")
+                    self.dropped += len(chunk) // RECORD.size
+            self._file.flush()
+            if self._closed and not self._pending:
+                return
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._handoff()
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        self._file.close()
+        print(f"Sessão gravada em {self.path} → {self.records} registros, {self.dropped} descartados")
+
+
+def read_session(path: str):
+    # Retorna (cabeçalho, registros) com registros = [(t_ns, tipo, payload)]; pacotes
+    # BLE-MIDI longos são remontados a partir das continuações
+    with open(path, "rb") as f:
+        raw = f.read()
+    magic, version, size, started, name, addr = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path} não é uma gravação de sessão")
+    if size != RECORD.size:
+        raise ValueError(f"{path}: versão de gravação não suportada ({version})")
+    header = {
+        "version": version,
+        "started": started,
+        "name":    name.rstrip(b"\0").decode(errors="replace"),
+        "address": addr.rstrip(b"\0").decode(errors="replace"),
+    }
+
+    records = []
+    end = len(raw) - (len(raw) - HEADER.size) % size  # ignora um registro truncado no fim
+    for t, kind, n, payload in RECORD.iter_unpack(raw[HEADER.size:end]):
+        payload = payload[:n]
+        if kind == KIND_MIDI_CONT and records and records[-1][1] == KIND_MIDI:
+            t_prev, _, data = records[-1]
+            records[-1] = (t_prev, KIND_MIDI, data + payload)
+        else:
+            records.append((t, kind, payload))
+    return header, records
@@ -0,0 +1,168 @@
+import asyncio
+import contextlib
+import os
+
+from PyQt6.QtCore import pyqtSignal
+
+from ble_client import BleConnection
+from ble_midi import BleMidiParser
+from constants import AccelLevel, MIDI_NOTE_NAMES, name_to_midi
+from gyro_map import GyroMap
+from session_recorder import (
+    KIND_STATUS, KIND_MIDI, KIND_CONNECTED, KIND_DISCONNECTED, read_session,
+)
+
+# Reprodução de uma gravação (session_recorder) no lugar de uma BleConnection (--replay).
+# Os pacotes passam pelos mesmos _on_status/_on_midi da conexão real, então DeviceTab,
+# seletor, fila MIDI e instrumentação se comportam como ao vivo. Velocidade 1 = tempo real,
+# 10/100 = acelerado, 0 = o mais rápido possível. Com remap, as notas gravadas são trocadas
+# pelas do setup atual, escolhidas pela seção do giroscópio no note-on (como o firmware faz).
+
+_DEFAULT_NOTES = [MIDI_NOTE_NAMES[n] for n in (60, 62, 64, 65, 67, 69)]
+_YIELD_EVERY   = 256  # registros entre pausas para o event loop no modo sem espera
+_MIN_SLEEP_NS  = 1_000_000
+
+
+class ReplayDevice:
+    # Ocupa o lugar do BLEDevice para a aba e o nome do arquivo de gravação
+    def __init__(self, path: str, header: dict):
+        base = os.path.splitext(os.path.basename(path))[0]
+        self.name    = f"Replay {header['name'] or base}"
+        self.address = header["address"] or base
+
+
+def initial_state_from_setup(setup: dict | None) -> dict:
+    if setup is None:
+        return {"notes": list(_DEFAULT_NOTES)}
+    state = {"notes": list(setup["notes"])}
+    level = next((l for l in AccelLevel if l.name.title() == setup.get("accel_level")), None)
+    if level is not None:
+        state["accel_level"] = level
+    for key in ("direction", "tilt_enabled", "legato_enabled"):
+        if key in setup:
+            state[key] = setup[key]
+    return state
+
+
+class ReplayConnection(BleConnection):
+    replay_finished = pyqtSignal()
+
+    def __init__(self, path: str, speed: float = 1.0, setup: dict | None = None,
+                 remap: bool = False, parent=None):
+        super().__init__(parent)
+        self.path  = path
+        self.header, self._records = read_session(path)
+        self.device = ReplayDevice(path, self.header)
+        self.speed = max(0.0, speed)
+        self.remap = remap
+        self.state = initial_state_from_setup(setup)
+        self.replayed = 0
+
+        # Estado do remapeamento: notas do setup atual, último giroscópio e as notas
+        # trocadas que ainda aguardam note-off
+        self._sections = [name_to_midi(n) for n in self.state["notes"]]
+        self._gyro     = 0
+        # Mesma tabela ângulo → seção do seletor ao vivo; os ticks não são usados aqui
+        self._gyro_map = GyroMap()
+        self._gyro_map.set_counts(len(self._sections), 1)
+        self._remapped: dict[tuple[int, int], int] = {}
+        self._remap_parser = BleMidiParser()
+
+    async def connect(self, device=None) -> None:
+        records = self._records
+        if not records:
+            self.replay_finished.emit()
+            return
+        print(f"Reproduzindo {self.path} ({len(records)} registros, {self.speed or 'máx'}×)")
+
+        loop    = asyncio.get_running_loop()
+        first   = records[0][0]
+        start   = loop.time()
+        speed   = self.speed
+        pending = 0
+        self._link_up()
+
+        for t, kind, payload in records:
+            if not self._running:
+                break
+            if speed:
+                # Agrupa registros próximos em vez de dormir por menos de 1 ms
+                wait = (t - first) / speed / 1e9 - (loop.time() - start)
+                if wait * 1e9 >= _MIN_SLEEP_NS:
+                    # Interrompida imediatamente por stop()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._stopped.wait(), wait)
+            else:
+                pending += 1
+                if pending >= _YIELD_EVERY:
+                    pending = 0
+                    await asyncio.sleep(0)
+
+            if kind == KIND_STATUS:
+                self._on_status(None, payload)
+                self._gyro = self.sample.gyro
+            elif kind == KIND_MIDI:
+                self._on_midi(None, payload)
+            elif kind == KIND_DISCONNECTED:
+                self.disconnected.emit()
+            elif kind == KIND_CONNECTED and self.replayed:
+                self.reconnects += 1
+                self._link_up()
+            self.replayed += 1
+
+        print(f"Reprodução concluída → {self.replayed} registros")
+        self.replay_finished.emit()
+
+    def _link_up(self) -> None:
+        self._midi_parser.reset()
+        self._remap_parser.reset()
+        self._remapped.clear()
+        self.connected.emit()
+        self.initial_state.emit(dict(self.state))
+
+    def _on_midi(self, char, data) -> None:
+        if self.remap:
+            data = self._remap_packet(data)
+        super()._on_midi(char, data)
+
+    def _remap_packet(self, data):
+        msgs = self._remap_parser.parse(data)
+        if not msgs or any(len(m) > 3 or m[0] == 0xF0 for _, m in msgs):
+            return data
+
+        section = self._gyro_map.section_at(self._gyro)
+        out     = bytearray([0x80 | (msgs[0][0] >> 7 & 0x3F)])
+        for ts, msg in msgs:
+            kind = msg[0] & 0xF0
+            if kind == 0x90 and msg[2]:
+                key  = (msg[0] & 0x0F, msg[1])
+                note = self._sections[section]
+                self._remapped[key] = note
+                msg  = [msg[0], note, msg[2]]
+            elif kind == 0x80 or kind == 0x90:
+                note = self._remapped.pop((msg[0] & 0x0F, msg[1]), msg[1])
+                msg  = [msg[0], note, msg[2]]
+            out.append(0x80 | (ts & 0x7F))
+            out += bytes(msg)
+        return out
+
+    # Escritas de configuração: não há dispositivo; só as notas importam (remapeamento)
+    def write_sections(self, notes_list: list) -> None:
+        self._sections = [name_to_midi(n) for n in notes_list] or self._sections
+        self._gyro_map.set_counts(len(self._sections), 1)
+        self.state["notes"] = list(notes_list)
+
+    def write_accel(self, level: AccelLevel) -> None:
+        self.state["accel_level"] = level
+
+    def write_direction(self, idx: int) -> None:
+        self.state["direction"] = idx
+
+    def write_tilt_enabled(self, enabled: bool) -> None:
+        self.state["tilt_enabled"] = enabled
+
+    def write_legato_enabled(self, enabled: bool) -> None:
+        self.state["legato_enabled"] = enabled
+
+    async def calibrate(self) -> None:
+        print("Calibração ignorada na reprodução.")
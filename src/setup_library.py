@@ -0,0 +1,173 @@
+import json
+import os
+import re
+
+from constants import INSTRUMENTS
+
+# Pasta de setups distribuída com o projeto
+REPERTORIO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "repertorio")
+
+# Parte do setup pelo sufixo do nome: "_d", "_d2"... (mão direita) ou "_e", "_e2"... (esquerda)
+_PART = re.compile(r"_([de])\d*$")
+
+
+def validate_setup(data) -> None:
+    # Levanta ValueError descrevendo o primeiro campo inválido
+    if not isinstance(data, dict):
+        raise ValueError("o arquivo não contém um objeto JSON")
+
+    sections = data.get("sections")
+    if not isinstance(sections, int) or not 1 <= sections <= 8:
+        raise ValueError("'sections' deve ser um inteiro entre 1 e 8")
+    notes = data.get("notes")
+    if not isinstance(notes, list) or len(notes) != sections or not all(isinstance(n, str) for n in notes):
+        raise ValueError("'notes' deve ser uma lista de nomes com 'sections' itens")
+    instrument = data.get("instrument")
+    if not isinstance(instrument, int) or not 0 <= instrument < len(INSTRUMENTS):
+        raise ValueError("'instrument' fora da lista de instrumentos")
+    if not isinstance(data.get("midi_port_index"), int) or data["midi_port_index"] < 0:
+        raise ValueError("'midi_port_index' deve ser um inteiro não negativo")
+    channel = data.get("midi_channel")
+    if not isinstance(channel, int) or not 1 <= channel <= 16:
+        raise ValueError("'midi_channel' deve estar entre 1 e 16")
+
+    for key in ("legato_enabled", "tilt_enabled"):
+        if key in data and not isinstance(data[key], bool):
+            raise ValueError(f"'{key}' deve ser true ou false")
+    if "direction" in data and data["direction"] not in (0, 1):
+        raise ValueError("'direction' deve ser 0 ou 1")
+    if "accel_level" in data and not isinstance(data["accel_level"], str):
+        raise ValueError("'accel_level' deve ser um texto")
+
+
+def read_setup(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    validate_setup(data)
+    return data
+
+
+class SetupEntry:
+    __slots__ = ("path", "name", "part", "mtime", "data")
+
+    def __init__(self, path: str, mtime: float, data: dict):
+        self.path  = path
+        self.name  = os.path.splitext(os.path.basename(path))[0]
+        match      = _PART.search(self.name)
+        self.part  = match.group(1) if match else None
+        self.mtime = mtime
+        self.data  = data
+
+
+class SetupLibrary:
+    # Índice em memória dos setups por pasta, em ordem alfabética, compartilhado pelas abas.
+    # Cada aba navega na pasta do seu setup; `directory` é só a pasta padrão. Cada arquivo é
+    # lido e validado uma vez; só é relido se o mtime mudar.
+    def __init__(self, directory: str = REPERTORIO_DIR):
+        self.directory = os.path.abspath(directory)
+        self._indexes: dict[str, list[SetupEntry]] = {}
+        self._cache: dict[str, SetupEntry] = {}
+        self.scan()
+
+    @property
+    def entries(self) -> list[SetupEntry]:
+        return self.entries_for(self.directory)
+
+    def entries_for(self, directory: str) -> list[SetupEntry]:
+        # Setups de uma pasta, varrida na primeira consulta
+        entries = self._indexes.get(os.path.abspath(directory))
+        return entries if entries is not None else self.scan(directory)
+
+    def scan(self, directory: str | None = None) -> list[SetupEntry]:
+        directory = os.path.abspath(directory or self.directory)
+        try:
+            names = sorted(n for n in os.listdir(directory) if n.lower().endswith(".json"))
+        except OSError as e:
+            print(f"Repertório indisponível ({directory}): {e}")
+            names = []
+
+        entries = []
+        for name in names:
+            entry = self._load(os.path.join(directory, name))
+            if entry is not None:
+                entries.append(entry)
+        self._indexes[directory] = entries
+        return entries
+
+    def load(self, path: str) -> SetupEntry | None:
+        # Relê um setup do índice se o arquivo mudou desde a varredura; None se foi removido
+        # ou ficou inválido, e nesse caso a pasta é varrida de novo
+        path      = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        previous  = self._cache.get(path)
+        entry     = self._load(path)
+        if entry is None:
+            self.scan(directory)
+        elif entry is not previous and directory in self._indexes:
+            self._indexes[directory] = [entry if e.path == path else e
+                                        for e in self._indexes[directory]]
+        return entry
+
+    def _load(self, path: str) -> SetupEntry | None:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        entry = self._cache.get(path)
+        if entry is not None and entry.mtime == mtime:
+            return entry
+        try:
+            entry = SetupEntry(path, mtime, read_setup(path))
+        except (OSError, ValueError) as e:
+            # json.JSONDecodeError também é ValueError
+            print(f"Setup ignorado ({os.path.basename(path)}): {e}")
+            self._cache.pop(path, None)
+            return None
+        self._cache[path] = entry
+        return entry
+
+
+class CueList:
+    # Posição de uma aba no repertório. As cenas seguinte e anterior ficam na pasta e na
+    # mesma parte do setup carregado (_d* ou _e*): cada parte é de um dispositivo, com canal
+    # próprio. A pasta é da aba; outras abas podem estar em outras pastas.
+    def __init__(self, library: SetupLibrary):
+        self.library   = library
+        self.directory = library.directory
+        self.path: str | None = None
+
+    def select(self, path: str) -> None:
+        path = os.path.abspath(path)
+        self.directory = os.path.dirname(path)
+        self.library.entries_for(self.directory)
+        self.path = path
+
+    def _current(self) -> SetupEntry | None:
+        return next((e for e in self.library.entries_for(self.directory) if e.path == self.path), None)
+
+    def cues(self) -> list[SetupEntry]:
+        current = self._current()
+        if current is None:
+            return []
+        return [e for e in self.library.entries_for(self.directory) if e.part == current.part]
+
+    def step(self, delta: int) -> SetupEntry | None:
+        # Próxima (+1) ou anterior (-1) cena, parando nas extremidades; sem setup carregado
+        # (ou com ele fora do índice, ex.: removido) nada acontece
+        cues = self.cues()
+        if not cues:
+            return None
+        position = next(i for i, e in enumerate(cues) if e.path == self.path)
+        target   = min(max(position + delta, 0), len(cues) - 1)
+        if target == position:
+            return None
+        entry = self.library.load(cues[target].path)
+        if entry is None:
+            return None
+        self.path = entry.path
+        return entry
+
+    @property
+    def position(self) -> int:
+        # Índice (0-based) da cena atual entre as da sua parte, ou -1
+        return next((i for i, e in enumerate(self.cues()) if e.path == self.path), -1)
@@ -0,0 +1,229 @@
+import asyncio
+import math
+import time
+
+from bleak.exc import BleakError
+
+from ble_client import STATUS_STRUCT
+from constants import (
+    SECTIONS_CHAR_UUID,
+    STATUS_CHARACTERISTIC_UUID,
+    ACCEL_SENS_CHARACTERISTIC_UUID,
+    CALIBRATE_CHAR_UUID,
+    BLE_MIDI_CHAR_UUID,
+    DIR_CHAR_UUID,
+    TILT_CHAR_UUID,
+    LEGATO_CHAR_UUID,
+    GYRO_MAX_DEG,
+)
+
+# Contato simulado (--simulate N): um servidor GATT falso atrás da mesma interface do
+# BleakClient usada por BleConnection. Gera STATUS a uma taxa configurável, rajadas de
+# BLE-MIDI e quedas de enlace roteirizadas, para testes de carga sem hardware.
+
+_CALIBRATION_S = 1.0
+
+
+class SimulatedDevice:
+    # Ocupa o lugar do BLEDevice (name/address); o estado GATT sobrevive às reconexões
+    def __init__(self, index: int, status_hz: float = 50.0, midi_hz: float = 4.0,
+                 midi_burst: int = 1, disconnect_every_s: float | None = None,
+                 disconnect_script: tuple[float, ...] = (), down_s: float = 0.5):
+        self.name    = f"Contato Simulado {index + 1}"
+        self.address = f"SIM:00:00:00:00:{index:02X}"
+        self.status_hz  = status_hz
+        self.midi_hz    = midi_hz
+        self.midi_burst = max(1, midi_burst)
+        # Quedas: periódicas e/ou nos instantes dados (s desde a primeira conexão);
+        # o dispositivo fica fora de alcance por down_s após cada queda
+        self.disconnect_every_s = disconnect_every_s
+        self.disconnect_script  = tuple(sorted(disconnect_script))
+        self.down_s             = down_s
+        # Fase própria por dispositivo para que as abas não se movam em sincronia
+        self.phase = index * 0.37
+
+        self.gatt: dict[str, bytes] = {
+            SECTIONS_CHAR_UUID:             bytes([60, 62, 64, 65, 67, 69]),
+            ACCEL_SENS_CHARACTERISTIC_UUID: (1250).to_bytes(2, "little", signed=True),
+            DIR_CHAR_UUID:                  b"\x00",
+            TILT_CHAR_UUID:                 b"\x00",
+            LEGATO_CHAR_UUID:               b"\x00",
+        }
+        self.status_sent  = 0
+        self.midi_sent    = 0   # notas (note-on e note-off)
+        self.midi_packets = 0   # pacotes de note-on
+        self.writes       = 0
+        self.drops        = 0
+        # Tempo conectado, para as taxas efetivamente entregues (o ticker não recupera atrasos)
+        self.connected_s  = 0.0
+        self.up_since: float | None = None
+
+    def client_factory(self, device, disconnected_callback=None, **_):
+        return SimulatedClient(device, disconnected_callback)
+
+    def summary(self) -> str:
+        up = self.connected_s
+        if self.up_since is not None:
+            up += time.monotonic() - self.up_since
+        status_hz = self.status_sent / up if up else 0.0
+        midi_hz   = self.midi_packets / up if up else 0.0
+        return (f"{self.name} → STATUS {status_hz:.1f}/{self.status_hz:g} Hz · "
+                f"MIDI {midi_hz:.1f}/{self.midi_hz:g} Hz · {self.drops} quedas · "
+                f"{self.writes} escritas em {up:.1f}s conectado")
+
+
+class SimulatedClient:
+    # Subconjunto do BleakClient usado por BleConnection e GattWriteQueue
+    def __init__(self, device: SimulatedDevice, disconnected_callback=None):
+        self.device       = device
+        self.is_connected = False
+        self._callback    = disconnected_callback
+        self._notify: dict[str, object] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._first_connect: float | None = None
+        self._down_until  = 0.0
+        self._script_pos  = 0
+        self._calibrating_until = 0.0
+
+    async def connect(self, **_) -> bool:
+        if time.monotonic() < self._down_until:
+            raise BleakError(f"{self.device.name} fora de alcance")
+        await asyncio.sleep(0.01)  # ida e volta de conexão
+        self.is_connected = True
+        self.device.up_since = time.monotonic()
+        if self._first_connect is None:
+            self._first_connect = time.monotonic()
+        self._tasks = [
+            asyncio.ensure_future(self._status_loop()),
+            asyncio.ensure_future(self._midi_loop()),
+            asyncio.ensure_future(self._drop_loop()),
+        ]
+        return True
+
+    async def disconnect(self) -> bool:
+        self._shutdown()
+        return True
+
+    async def read_gatt_char(self, uuid: str) -> bytearray:
+        self._check()
+        await asyncio.sleep(0)
+        return bytearray(self.device.gatt[uuid])
+
+    async def write_gatt_char(self, uuid: str, data, response: bool = True) -> None:
+        self._check()
+        await asyncio.sleep(0)
+        if uuid == CALIBRATE_CHAR_UUID:
+            self._calibrating_until = time.monotonic() + _CALIBRATION_S
+            return
+        self.device.gatt[uuid] = bytes(data)
+        self.device.writes += 1
+
+    async def start_notify(self, uuid: str, callback, **_) -> None:
+        self._check()
+        self._notify[uuid] = callback
+
+    async def stop_notify(self, uuid: str) -> None:
+        self._notify.pop(uuid, None)
+
+    def _check(self) -> None:
+        if not self.is_connected:
+            raise BleakError("Não conectado")
+
+    def _shutdown(self) -> None:
+        self.is_connected = False
+        dev = self.device
+        if dev.up_since is not None:
+            dev.connected_s += time.monotonic() - dev.up_since
+            dev.up_since = None
+        self._notify.clear()
+        current = asyncio.current_task()
+        for t in self._tasks:
+            if t is not current:
+                t.cancel()
+        self._tasks = []
+
+    def _drop(self) -> None:
+        # Queda de enlace vinda do "rádio": o cliente só fica sabendo pelo callback
+        self.device.drops += 1
+        self._down_until = time.monotonic() + self.device.down_s
+        self._shutdown()
+        if self._callback is not None:
+            self._callback(self)
+
+    async def _drop_loop(self) -> None:
+        dev  = self.device
+        t0   = self._first_connect
+        last = time.monotonic()
+        while True:
+            due = []
+            if dev.disconnect_every_s:
+                due.append(last + dev.disconnect_every_s)
+            if self._script_pos < len(dev.disconnect_script):
+                due.append(t0 + dev.disconnect_script[self._script_pos])
+            if not due:
+                return
+            await asyncio.sleep(max(0.0, min(due) - time.monotonic()))
+            if self._script_pos < len(dev.disconnect_script) \
+                    and time.monotonic() >= t0 + dev.disconnect_script[self._script_pos]:
+                self._script_pos += 1
+            self._drop()
+            return
+
+    async def _ticker(self, hz: float):
+        # Períodos em tempo absoluto; se atrasar mais de um período, recomeça sem rajada
+        period = 1.0 / hz
+        due    = time.monotonic()
+        while True:
+            due += period
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -period:
+                due = time.monotonic()
+            yield
+
+    async def _status_loop(self) -> None:
+        dev  = self.device
+        pack = STATUS_STRUCT.pack
+        t0   = time.monotonic()
+        async for _ in self._ticker(dev.status_hz):
+            cb = self._notify.get(STATUS_CHARACTERISTIC_UUID)
+            if cb is None:
+                continue
+            t     = time.monotonic() - t0 + dev.phase
+            state = 1 if time.monotonic() < self._calibrating_until else 0
+            gyro  = int(GYRO_MAX_DEG * math.sin(t * math.pi / 2))
+            touch = 1 if (t % 1.5) < 0.6 else 0
+            accel = int(800 * abs(math.sin(t * 5)))
+            tilt  = int(30 * math.sin(t * 0.9))
+            cb(None, bytearray(pack(state, touch, gyro, accel, tilt)))
+            dev.status_sent += 1
+
+    async def _midi_loop(self) -> None:
+        # Pacotes BLE-MIDI com midi_burst note-ons; os note-offs correspondentes saem
+        # no pacote seguinte. Timestamps de 13 bits em ms, como no firmware.
+        dev   = self.device
+        if dev.midi_hz <= 0:
+            return
+        on    = True
+        notes: list[int] = []
+        async for _ in self._ticker(dev.midi_hz * 2):
+            cb = self._notify.get(BLE_MIDI_CHAR_UUID)
+            if cb is None:
+                continue
+            ts = int(time.monotonic() * 1000) & 0x1FFF
+            if on:
+                sections = dev.gatt[SECTIONS_CHAR_UUID]
+                notes = [sections[(dev.midi_sent + i) % len(sections)] for i in range(dev.midi_burst)]
+            packet = bytearray([0x80 | (ts >> 7 & 0x3F)])
+            for n in notes:
+                packet += bytes([0x80 | (ts & 0x7F), 0x90 if on else 0x80, n & 0x7F, 100 if on else 0])
+            cb(None, packet)
+            dev.midi_sent += len(notes)
+            if on:
+                dev.midi_packets += 1
+            on = not on
+
+
+def simulated_devices(count: int, **kwargs) -> list[SimulatedDevice]:
+    return [SimulatedDevice(i, **kwargs) for i in range(count)]
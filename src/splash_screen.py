@@ -1,20 +1,15 @@
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QApplication
-from PyQt6.QtGui import QPixmap, QPainter, QColor
+from PyQt6.QtGui import QPainter, QColor
 
 from constants import _asset
+from pixmap_cache import scaled_pixmap
 
 
 def _logo(path: str, w: int, h: int) -> QLabel:
     ratio = QApplication.primaryScreen().devicePixelRatio()
-    pix = QPixmap(path).scaled(
-        int(w * ratio), int(h * ratio),
-        Qt.AspectRatioMode.KeepAspectRatio,
-        Qt.TransformationMode.SmoothTransformation,
-    )
-    pix.setDevicePixelRatio(ratio)
     lbl = QLabel()
-    lbl.setPixmap(pix)
+    lbl.setPixmap(scaled_pixmap(path, w, h, ratio))
     lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
     lbl.setStyleSheet("background: transparent;")
     return lbl